@@ -12,8 +12,23 @@ Este programa implementa un menú interactivo para ejecutar los siguientes algor
 
 Cada algoritmo genera visualizaciones en formato PNG y muestra resultados en consola.
 
+También puede ejecutarse sin menú, por ejemplo desde un planificador de tareas:
+
+    python main.py prim data/grafos/a.csv data/grafos/b.csv -o resultados.jsonl
+    python main.py dijkstra data/grafos/a.csv --origen A --formato npz -o res.npz
+    python main.py huffman --lista entradas.txt
+    python main.py servidor --grafo ejemplo=data/grafos/grafo_ejemplo.csv
+    python main.py comprimir data/textos/a.txt a.huf
+    python main.py descomprimir a.huf a.txt
+
+Cada subcomando procesa todos los archivos en el mismo proceso y escribe
+una línea JSON por archivo (o un .npz con todos los resultados). El
+subcomando servidor deja los grafos cargados y atiende consultas por HTTP.
+comprimir/descomprimir escriben el archivo codificado con Huffman.
+
 """
 
+import argparse
 import os
 import sys
 
@@ -212,6 +227,188 @@ def pausar() -> None:
     input("\nPresione Enter para continuar...")
 
 
+def crear_parser() -> argparse.ArgumentParser:
+    """
+    Crea el parser de la línea de comandos con un subcomando por algoritmo.
+    """
+    parser = argparse.ArgumentParser(
+        description="Ejecuta Prim, Kruskal, Dijkstra o Huffman sin menú interactivo."
+    )
+    subcomandos = parser.add_subparsers(dest="algoritmo", required=True)
+
+    ayudas = {
+        "prim": "Árbol de Expansión Mínima con Prim",
+        "kruskal": "Árbol de Expansión Mínima con Kruskal",
+        "boruvka": "Árbol de Expansión Mínima con Borůvka (rondas vectorizadas)",
+        "dijkstra": "Caminos más cortos desde un origen",
+        "huffman": "Códigos de Huffman de archivos de texto",
+    }
+    for nombre, ayuda in ayudas.items():
+        sub = subcomandos.add_parser(nombre, help=ayuda)
+        sub.add_argument("archivos", nargs="*", help="Archivos de entrada")
+        sub.add_argument("--lista", help="Archivo con una ruta por línea (\"-\" = entrada estándar)")
+        sub.add_argument("-o", "--salida", default="-", help="Archivo de salida (\"-\" = salida estándar)")
+        sub.add_argument("--formato", choices=("json", "npz"), default="json",
+                         help="json: una línea por archivo; npz: arreglos binarios de NumPy")
+        if nombre != "huffman":
+            sub.add_argument("--sin-cache", action="store_true", help="No usar la cache binaria del grafo")
+        if nombre == "dijkstra":
+            sub.add_argument("--origen", required=True, help="Nodo origen")
+            sub.add_argument("--destino", help="Solo la ruta hasta este nodo (búsqueda bidireccional)")
+        if nombre == "prim":
+            sub.add_argument("--inicio", help="Nodo inicial (por defecto el primero del CSV)")
+            sub.add_argument("--modo", choices=("auto", "heap", "indexado", "denso"), default="auto",
+                             help="heap: heapq perezoso; indexado: heap con disminución de clave; "
+                                  "denso: O(V²) con matriz; auto: según la densidad")
+        if nombre == "kruskal":
+            sub.add_argument("--modo", choices=("auto", "ordenar", "filtrar"), default="auto",
+                             help="ordenar: todas las aristas; filtrar: Filter-Kruskal")
+
+    servidor = subcomandos.add_parser("servidor", help="Servicio HTTP local con los grafos en memoria")
+    servidor.add_argument("--grafo", action="append", default=[], metavar="NOMBRE=RUTA",
+                          help="Grafo a cargar al iniciar (se puede repetir)")
+    servidor.add_argument("--host", default="127.0.0.1", help="Dirección (por defecto solo local)")
+    servidor.add_argument("--puerto", type=int, default=8765, help="Puerto TCP")
+    servidor.add_argument("--unix", help="Escuchar en este socket Unix en vez de TCP")
+    servidor.add_argument("--procesos", type=int, help="Procesos de cálculo (0 = un hilo)")
+    servidor.add_argument("--ventana-ms", type=float, default=2.0,
+                          help="Espera para juntar solicitudes en un lote")
+    servidor.add_argument("--max-lote", type=int, default=64, help="Solicitudes máximas por lote")
+    servidor.add_argument("--datos", default="data/grafos",
+                          help="Directorio del que POST /grafos puede cargar CSV")
+
+    comprimir = subcomandos.add_parser("comprimir", help="Comprime un archivo de texto con Huffman")
+    comprimir.add_argument("entrada", help="Archivo de texto UTF-8 (\"-\" = entrada estándar)")
+    comprimir.add_argument("salida", help="Archivo comprimido (\"-\" = salida estándar)")
+    comprimir.add_argument("--largo-maximo", type=int,
+                           help="Largo máximo de los códigos en bits (package-merge)")
+    comprimir.add_argument("--frecuencias",
+                           help="JSON {carácter: frecuencia} para comprimir en una sola pasada "
+                                "(necesario con la entrada estándar)")
+    comprimir.add_argument("--bytes", action="store_true",
+                           help="Codificar bytes en vez de caracteres (cualquier archivo, más rápido)")
+
+    descomprimir = subcomandos.add_parser("descomprimir", help="Restaura un archivo comprimido")
+    descomprimir.add_argument("entrada", help="Archivo comprimido (\"-\" = entrada estándar)")
+    descomprimir.add_argument("salida", help="Archivo de texto restaurado (\"-\" = salida estándar)")
+
+    return parser
+
+
+def ejecutar_servidor(args: argparse.Namespace) -> int:
+    """
+    Inicia el servicio local con los grafos indicados en --grafo.
+    """
+    from src.servidor import servir
+
+    grafos = {}
+    for par in args.grafo:
+        nombre, separador, ruta = par.partition("=")
+        if not separador or not nombre or not ruta:
+            print(f"Error: --grafo espera NOMBRE=RUTA, no '{par}'", file=sys.stderr)
+            return 2
+        grafos[nombre] = ruta
+
+    servir(grafos, args.host, args.puerto, args.unix, args.procesos,
+           args.ventana_ms / 1000, args.max_lote, args.datos)
+    return 0
+
+
+def ejecutar_compresion(args: argparse.Namespace) -> int:
+    """
+    Comprime o descomprime un archivo y muestra tamaños y velocidad.
+
+    Con "-" se usa la entrada o salida estándar; en ese caso el resumen va
+    a la salida de errores para no mezclarse con los datos.
+    """
+    import json
+    from src.compresion import comprimir, descomprimir
+
+    entrada = sys.stdin.buffer if args.entrada == "-" else args.entrada
+    salida = sys.stdout.buffer if args.salida == "-" else args.salida
+    resumen = sys.stderr if args.salida == "-" else sys.stdout
+    try:
+        if args.algoritmo == "comprimir":
+            frecuencias = None
+            if args.frecuencias:
+                with open(args.frecuencias, "r", encoding="utf-8") as f:
+                    frecuencias = json.load(f)
+                # En modo bytes: lista de 256 frecuencias o {"byte": frecuencia}
+                if args.bytes:
+                    frecuencias = (dict(enumerate(frecuencias)) if isinstance(frecuencias, list)
+                                   else {int(b): c for b, c in frecuencias.items()})
+            est = comprimir(entrada, salida, args.largo_maximo, frecuencias,
+                            "bytes" if args.bytes else "texto")
+        else:
+            est = descomprimir(entrada, salida)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"{args.entrada} ({est['bytes_entrada']} bytes) -> {args.salida} "
+          f"({est['bytes_salida']} bytes, {est['tasa']:.1%}) en {est['segundos']:.3f} s, "
+          f"{est['mb_por_segundo']:.2f} MB/s", file=resumen)
+    if "largo_maximo" in est:
+        print(f"Código más largo: {est['largo_maximo']} bits, "
+              f"{est['penalizacion']:+.3%} de datos respecto al árbol sin límite", file=resumen)
+    return 0
+
+
+def ejecutar_lote(argumentos: list) -> int:
+    """
+    Ejecuta un subcomando sobre todos los archivos indicados en un solo proceso.
+
+    Devuelve el código de salida: 0 si todos los archivos se procesaron
+    bien y 1 si alguno falló (los errores quedan en su resultado).
+    """
+    from src.lote import escribir_json, escribir_npz, procesar
+
+    args = crear_parser().parse_args(argumentos)
+    if args.algoritmo == "servidor":
+        return ejecutar_servidor(args)
+    if args.algoritmo in ("comprimir", "descomprimir"):
+        return ejecutar_compresion(args)
+
+    archivos = list(args.archivos)
+    if args.lista:
+        if args.lista == "-":
+            lineas = sys.stdin.read().splitlines()
+        else:
+            with open(args.lista, "r", encoding="utf-8") as f:
+                lineas = f.read().splitlines()
+        archivos.extend(linea.strip() for linea in lineas if linea.strip())
+    if not archivos:
+        print("Error: no se indicaron archivos de entrada", file=sys.stderr)
+        return 2
+
+    origen = getattr(args, "origen", None) or getattr(args, "inicio", None)
+    usar_cache = not getattr(args, "sin_cache", False)
+    modo = getattr(args, "modo", "auto")
+    destino = getattr(args, "destino", None)
+    fallos = []
+
+    def resultados():
+        for ruta in archivos:
+            resultado = procesar(args.algoritmo, ruta, origen, usar_cache, modo, destino)
+            if "error" in resultado:
+                fallos.append(ruta)
+            yield resultado
+
+    if args.formato == "json":
+        if args.salida == "-":
+            escribir_json(resultados(), sys.stdout)
+        else:
+            with open(args.salida, "w", encoding="utf-8") as f:
+                escribir_json(resultados(), f)
+    else:
+        if args.salida == "-":
+            escribir_npz(resultados(), sys.stdout.buffer)
+        else:
+            with open(args.salida, "wb") as f:
+                escribir_npz(resultados(), f)
+
+    return 1 if fallos else 0
+
+
 def main() -> None:
     """
     Función principal del programa.
@@ -274,4 +471,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(ejecutar_lote(sys.argv[1:]))
     main()
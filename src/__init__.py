@@ -1,19 +1,54 @@
 """
 Paquete src - Algoritmos de grafos y compresión
+
+Los submódulos se importan al primer uso de cada nombre, así importar el
+paquete no carga nada que no se vaya a usar.
 """
 
-from .prim import ejecutar_prim, algoritmo_prim
-from .kruskal import ejecutar_kruskal, algoritmo_kruskal
-from .dijkstra import ejecutar_dijkstra, algoritmo_dijkstra
-from .huffman import ejecutar_huffman, construir_arbol_huffman
-
-__all__ = [
-    'ejecutar_prim',
-    'algoritmo_prim',
-    'ejecutar_kruskal',
-    'algoritmo_kruskal',
-    'ejecutar_dijkstra',
-    'algoritmo_dijkstra',
-    'ejecutar_huffman',
-    'construir_arbol_huffman',
-]
+import importlib
+
+# Nombre exportado -> submódulo que lo define
+_EXPORTS = {
+    'Grafo': 'grafo',
+    'leer_grafo': 'grafo',
+    'cargar_grafo': 'cache_grafo',
+    'ejecutar_prim': 'prim',
+    'algoritmo_prim': 'prim',
+    'ejecutar_kruskal': 'kruskal',
+    'algoritmo_kruskal': 'kruskal',
+    'ejecutar_dijkstra': 'dijkstra',
+    'algoritmo_dijkstra': 'dijkstra',
+    'ruta_mas_corta': 'dijkstra',
+    'algoritmo_delta_stepping': 'delta_stepping',
+    'todas_las_rutas': 'dijkstra',
+    'escribir_rutas': 'dijkstra',
+    'actualizar_dijkstra': 'dinamico',
+    'IndiceALT': 'alt',
+    'JerarquiaContraccion': 'contraccion',
+    'calcular_matriz_distancias': 'matriz_distancias',
+    'CacheArboles': 'cache_rutas',
+    'algoritmo_boruvka': 'boruvka',
+    'algoritmo_bosque': 'bosque',
+    'etiquetar_componentes': 'bosque',
+    'ejecutar_huffman': 'huffman',
+    'construir_arbol_huffman': 'huffman',
+    'comprimir': 'compresion',
+    'descomprimir': 'compresion',
+    'Servidor': 'servidor',
+    'servir': 'servidor',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(nombre):
+    if nombre in _EXPORTS:
+        modulo = importlib.import_module(f'.{_EXPORTS[nombre]}', __name__)
+        valor = getattr(modulo, nombre)
+        globals()[nombre] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,213 @@
+import heapq
+import random
+
+import numpy as np
+
+try:
+    from .dijkstra import dijkstra_ids
+    from .grafo import como_grafo
+except ImportError:
+    from dijkstra import dijkstra_ids
+    from grafo import como_grafo
+
+
+# Distancias menores a esto se guardan exactas en float32
+LIMITE_FLOAT32 = 1 << 24
+
+
+# Distancias desde un nodo como arreglo float64 (inf = no alcanzable)
+def _distancias(grafo, s):
+    return np.array(dijkstra_ids(grafo, s)[0], dtype=np.float64)
+
+
+# Siguiente landmark "farthest" según la distancia de cada nodo al landmark
+# más cercano (cercania): primero los nodos que ningún landmark alcanza,
+# después el más lejano. None si todos los nodos están a distancia 0.
+def _siguiente_lejano(cercania, landmarks):
+    sin_cubrir = np.flatnonzero(np.isinf(cercania))
+    if len(sin_cubrir):
+        return int(sin_cubrir[0])
+    candidatos = cercania.copy()
+    candidatos[landmarks] = -1
+    actual = int(np.argmax(candidatos))
+    return actual if candidatos[actual] > 0 else None
+
+
+# Landmarks "farthest": cada nuevo landmark es el nodo más lejano (entre los
+# alcanzables) al conjunto ya elegido. Si algún nodo no es alcanzable desde
+# ningún landmark, se empieza por él para cubrir también esa componente.
+def _seleccion_lejanos(grafo, k, rng):
+    n = len(grafo)
+    landmarks = []
+    tablas = []
+    cercania = np.full(n, np.inf)
+    actual = rng.randrange(n)
+    while actual is not None and len(landmarks) < min(k, n):
+        dist = _distancias(grafo, actual)
+        landmarks.append(actual)
+        tablas.append(dist)
+        cercania = np.minimum(cercania, dist)
+        actual = _siguiente_lejano(cercania, landmarks)
+    return landmarks, tablas
+
+
+# Landmarks "avoid" (Goldberg-Harrelson): desde una raíz al azar se mide,
+# para cada nodo, cuánto falla la cota actual (d(r,v) - cota(r,v)) y se
+# suma por subárbol del árbol de caminos más cortos, ignorando subárboles
+# que ya tienen landmark. El nuevo landmark es la hoja a la que se llega
+# bajando desde el subárbol peor cubierto.
+# La raíz y su árbol se calculan una sola vez y la cota se actualiza con
+# la tabla de cada landmark nuevo, así cada landmark cuesta un Dijkstra.
+def _seleccion_evitar(grafo, k, rng):
+    n = len(grafo)
+    landmarks, tablas = _seleccion_lejanos(grafo, 1, rng)
+    cercania = tablas[0].copy()
+
+    raiz = rng.randrange(n)
+    dist, prev = dijkstra_ids(grafo, raiz)
+    dist = np.array(dist, dtype=np.float64)
+    prev = np.asarray(prev, dtype=np.int64).tolist()
+    alcanzables = np.flatnonzero(np.isfinite(dist))
+    # Hijos antes que padres: recorrer por distancia decreciente
+    orden = alcanzables[np.argsort(dist[alcanzables], kind='stable')[::-1]].tolist()
+    cota = np.zeros(n)
+
+    while len(landmarks) < min(k, n):
+        # Cota de la raíz con el último landmark: max_L |d(L,r) - d(L,v)|
+        with np.errstate(invalid='ignore'):
+            nueva = np.abs(tablas[-1] - tablas[-1][raiz])
+        np.fmax(cota, np.nan_to_num(nueva, nan=0.0, posinf=0.0), out=cota)
+        tamano_l = np.where(np.isfinite(dist), dist - cota, 0.0).tolist()
+        marca = [False] * n
+        for x in landmarks:
+            marca[x] = True
+
+        mejor_hijo = [-1] * n
+        for v in orden:
+            p = prev[v]
+            if marca[v]:
+                tamano_l[v] = 0.0
+            if p >= 0:
+                if marca[v]:
+                    marca[p] = True
+                else:
+                    tamano_l[p] += tamano_l[v]
+                    h = mejor_hijo[p]
+                    if h < 0 or tamano_l[v] > tamano_l[h]:
+                        mejor_hijo[p] = v
+
+        v = max(orden, key=lambda x: (0.0 if marca[x] else tamano_l[x]))
+        if marca[v] or tamano_l[v] <= 0:
+            # Todo está cubierto: completar con el criterio "farthest" sobre
+            # las tablas ya calculadas
+            v = _siguiente_lejano(cercania, landmarks)
+            if v is None:
+                break
+        else:
+            while mejor_hijo[v] >= 0:
+                v = mejor_hijo[v]
+        landmarks.append(v)
+        tablas.append(_distancias(grafo, v))
+        cercania = np.minimum(cercania, tablas[-1])
+    return landmarks, tablas
+
+
+# Índice ALT (A*, landmarks y desigualdad triangular) para consultas
+# punto a punto repetidas sobre un grafo fijo
+class IndiceALT:
+    def __init__(self, grafo, landmarks, tablas):
+        self.grafo = como_grafo(grafo)
+        self.landmarks = np.asarray(landmarks, dtype=np.int64)
+        # Una fila por nodo con sus distancias a cada landmark (contiguas)
+        self.tablas = np.ascontiguousarray(tablas)
+        self.explorados = 0
+
+    # Preprocesa k landmarks con seleccion='farthest' o 'avoid'
+    @classmethod
+    def construir(cls, grafo, k=8, seleccion='farthest', semilla=0):
+        grafo = como_grafo(grafo)
+        if len(grafo) == 0:
+            raise ValueError("El grafo está vacío")
+        rng = random.Random(semilla)
+        if seleccion == 'farthest':
+            landmarks, tablas = _seleccion_lejanos(grafo, k, rng)
+        elif seleccion == 'avoid':
+            landmarks, tablas = _seleccion_evitar(grafo, k, rng)
+        else:
+            raise ValueError(f"Selección de landmarks desconocida: {seleccion}")
+
+        tablas = np.array(tablas).T
+        finitas = tablas[np.isfinite(tablas)]
+        if not len(finitas) or finitas.max() < LIMITE_FLOAT32:
+            tablas = tablas.astype(np.float32)
+        return cls(grafo, landmarks, tablas)
+
+    def guardar(self, ruta):
+        with open(ruta, 'wb') as f:
+            np.savez(f, landmarks=self.landmarks, tablas=self.tablas,
+                     huella=np.array(self.grafo.huella))
+
+    # Carga un índice guardado; falla si se construyó con otro grafo
+    @classmethod
+    def cargar(cls, ruta, grafo):
+        grafo = como_grafo(grafo)
+        with np.load(ruta) as datos:
+            if str(datos['huella']) != grafo.huella:
+                raise ValueError("El índice ALT no corresponde a este grafo")
+            return cls(grafo, datos['landmarks'], datos['tablas'])
+
+    # Camino más corto entre dos nodos con A*: (distancia, ruta con nombres).
+    # self.explorados queda con la cantidad de nodos fijados.
+    def consulta(self, origen, destino):
+        grafo = self.grafo
+        for nodo in (origen, destino):
+            if nodo not in grafo:
+                print(f"Error: nodo '{nodo}' no existe")
+                return float('inf'), []
+        s, t = grafo.indices[origen], grafo.indices[destino]
+        offsets, destinos, pesos = grafo.offsets, grafo.destinos, grafo.pesos
+
+        tablas = self.tablas
+        fila_t = tablas[t].astype(np.float64)
+        fmax = np.fmax.reduce
+
+        # h(v) = max_L |d(L,v) - d(L,t)|; inf si v y t están en componentes
+        # distintas según algún landmark (la consulta puede descartar v)
+        def cota(v):
+            with np.errstate(invalid='ignore'):
+                h = float(fmax(np.abs(tablas[v] - fila_t)))
+            return 0.0 if h != h else h
+
+        dist = {s: 0}
+        prev = {s: -1}
+        cerrados = set()
+        heap = [(cota(s), 0, s)]
+        self.explorados = 0
+
+        while heap:
+            _, dist_actual, nodo_actual = heapq.heappop(heap)
+            if nodo_actual in cerrados:
+                continue
+            if nodo_actual == t:
+                camino = []
+                while nodo_actual != -1:
+                    camino.append(grafo.nombres[nodo_actual])
+                    nodo_actual = prev[nodo_actual]
+                return dist_actual, camino[::-1]
+            cerrados.add(nodo_actual)
+            self.explorados += 1
+
+            a, b = offsets[nodo_actual], offsets[nodo_actual + 1]
+            for vecino, peso in zip(destinos[a:b].tolist(), pesos[a:b].tolist()):
+                if vecino in cerrados:
+                    continue
+                nueva_dist = dist_actual + peso
+                if nueva_dist < dist.get(vecino, float('inf')):
+                    h = cota(vecino)
+                    if h == float('inf'):
+                        continue
+                    dist[vecino] = nueva_dist
+                    prev[vecino] = nodo_actual
+                    heapq.heappush(heap, (nueva_dist + h, nueva_dist, vecino))
+
+        return float('inf'), []
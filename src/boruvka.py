@@ -0,0 +1,62 @@
+import numpy as np
+
+try:
+    from .bosque import raices_por_aristas
+    from .grafo import como_grafo
+except ImportError:
+    from bosque import raices_por_aristas
+    from grafo import como_grafo
+
+
+# Algoritmo de Borůvka. En cada ronda todas las componentes eligen a la
+# vez su arista de salida más barata (mínimo segmentado sobre los arreglos
+# de aristas) y se contraen; las rondas son O(log V).
+# Los empates se rompen por el índice de la arista, así el orden es total y
+# las aristas elegidas nunca forman ciclo. En grafos no conexos devuelve el
+# bosque mínimo, igual que Kruskal.
+def algoritmo_boruvka(grafo):
+    if not grafo:
+        return [], 0
+    
+    grafo = como_grafo(grafo)
+    n = len(grafo)
+    o, d, p = grafo.aristas_ids()
+    
+    componente = np.arange(n, dtype=np.int64)
+    # Aristas ordenadas una sola vez por (peso, índice); al filtrar se
+    # conserva el orden, así en cada ronda la posición es el rango
+    activas = np.argsort(p, kind='stable')
+    activas = activas[o[activas] != d[activas]]
+    elegidas = []
+    
+    while len(activas):
+        cu = componente[o[activas]]
+        cv = componente[d[activas]]
+        
+        # Descartar aristas que ya quedaron dentro de una componente
+        cruzan = cu != cv
+        activas, cu, cv = activas[cruzan], cu[cruzan], cv[cruzan]
+        if not len(activas):
+            break
+        
+        # Mínimo segmentado: el menor rango de arista que toca cada componente
+        rango = np.arange(len(activas))
+        mejor = np.full(n, len(activas))
+        np.minimum.at(mejor, cu, rango)
+        np.minimum.at(mejor, cv, rango)
+        rangos = np.unique(mejor[mejor < len(activas)])
+        ronda = activas[rangos]
+        elegidas.append(ronda)
+        
+        # Contraer: cada componente pasa a la raíz de su grupo
+        raiz = raices_por_aristas(n, componente[o[ronda]], componente[d[ronda]])
+        componente = raiz[componente]
+    
+    if not elegidas:
+        return [], 0
+    
+    elegidas = np.concatenate(elegidas)
+    nombres = grafo.nombres
+    pesos = p[elegidas].tolist()
+    mst = [(nombres[u], nombres[v], w) for u, v, w in zip(o[elegidas].tolist(), d[elegidas].tolist(), pesos)]
+    return mst, sum(pesos)
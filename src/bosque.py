@@ -0,0 +1,134 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from .grafo import como_grafo
+    from .kruskal import UnionFindArreglo
+except ImportError:
+    from grafo import como_grafo
+    from kruskal import UnionFindArreglo
+
+
+# Bajo este número de aristas no compensa lanzar procesos
+UMBRAL_PARALELO = 200000
+# Tareas por proceso, para repartir mejor componentes de tamaños distintos
+TAREAS_POR_PROCESO = 4
+
+
+# Une las aristas (origenes[i], destinos[i]) sobre los ids 0..n-1 con
+# operaciones vectorizadas: cada arista que cruza dos etiquetas cuelga la
+# mayor de la menor y luego se comprimen los caminos saltando de padre en
+# padre. Cada ronda al menos reduce a la mitad las raíces con aristas
+# pendientes. Devuelve la raíz (el id menor) de cada id.
+def raices_por_aristas(n, origenes, destinos):
+    etiqueta = np.arange(n, dtype=np.int64)
+    while True:
+        eu = etiqueta[origenes]
+        ev = etiqueta[destinos]
+        cruzan = eu != ev
+        if not cruzan.any():
+            return etiqueta
+        menor = np.minimum(eu[cruzan], ev[cruzan])
+        mayor = np.maximum(eu[cruzan], ev[cruzan])
+        np.minimum.at(etiqueta, mayor, menor)
+        while True:
+            siguiente = etiqueta[etiqueta]
+            if np.array_equal(siguiente, etiqueta):
+                break
+            etiqueta = siguiente
+
+
+# Etiqueta las componentes conexas.
+# Devuelve (componente de cada nodo, cantidad de componentes); las
+# componentes se numeran por su nodo de menor id.
+def etiquetar_componentes(grafo):
+    grafo = como_grafo(grafo)
+    origenes, destinos, _ = grafo.aristas_ids()
+    etiqueta = raices_por_aristas(len(grafo), origenes, destinos)
+    raices, componente = np.unique(etiqueta, return_inverse=True)
+    return componente.ravel(), len(raices)
+
+
+# Kruskal sobre un lote de componentes completas (se ejecuta en un proceso
+# aparte). Devuelve los índices globales de las aristas elegidas.
+def _bosque_lote(origenes, destinos, pesos, indices, num_componentes):
+    nodos, local = np.unique(np.concatenate((origenes, destinos)), return_inverse=True)
+    local = local.ravel()
+    m = len(origenes)
+    orden = np.argsort(pesos, kind='stable')
+    uf = UnionFindArreglo(len(nodos))
+    unidas = uf.unir_lote(local[:m][orden], local[m:][orden], len(nodos) - num_componentes)
+    return indices[orden[unidas]]
+
+
+# Parte las aristas (ya agrupadas por componente) en tareas contiguas de
+# tamaño parecido sin cortar ninguna componente
+def _repartir(limites, num_tareas):
+    total = limites[-1]
+    objetivos = np.linspace(0, total, num_tareas + 1)[1:-1]
+    cortes = np.unique(np.searchsorted(limites, objetivos))
+    cortes = cortes[(cortes > 0) & (cortes < len(limites) - 1)]
+    return np.concatenate(([0], cortes, [len(limites) - 1]))
+
+
+# Bosque de expansión mínima: un árbol por componente conexa.
+# Devuelve una lista con (mst, peso_total) por componente, en el orden de
+# etiquetar_componentes; los nodos aislados dan ([], 0). Las componentes se
+# resuelven en paralelo con un pool de procesos (procesos=1 lo evita).
+def algoritmo_bosque(grafo, procesos=None):
+    grafo = como_grafo(grafo)
+    componente, k = etiquetar_componentes(grafo)
+    m = grafo.num_aristas
+    if m == 0:
+        return [([], 0) for _ in range(k)]
+
+    if procesos is None:
+        procesos = 1 if m < UMBRAL_PARALELO else (os.cpu_count() or 1)
+
+    # Agrupar aristas por componente
+    todas_o, todas_d, todas_p = grafo.aristas_ids()
+    comp_arista = componente[todas_o]
+    orden = np.argsort(comp_arista, kind='stable')
+    conteo = np.bincount(comp_arista, minlength=k)
+    limites = np.zeros(k + 1, dtype=np.int64)
+    np.cumsum(conteo, out=limites[1:])
+
+    o = todas_o[orden]
+    d = todas_d[orden]
+    p = todas_p[orden]
+
+    cortes = _repartir(limites, procesos * TAREAS_POR_PROCESO if procesos > 1 else 1)
+    tareas = []
+    for c0, c1 in zip(cortes[:-1].tolist(), cortes[1:].tolist()):
+        a, b = limites[c0], limites[c1]
+        if a == b:
+            continue
+        # Solo cuentan las componentes con aristas (las aisladas no tienen nodos aquí)
+        con_aristas = int(np.count_nonzero(conteo[c0:c1]))
+        tareas.append((o[a:b], d[a:b], p[a:b], orden[a:b], con_aristas))
+
+    if procesos > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            elegidas = list(pool.map(_bosque_lote, *zip(*tareas)))
+    else:
+        elegidas = [_bosque_lote(*tarea) for tarea in tareas]
+    elegidas = np.concatenate(elegidas) if elegidas else np.empty(0, dtype=np.int64)
+
+    # Separar las aristas elegidas por componente conservando el orden
+    nombres = grafo.nombres
+    arboles = [([], 0) for _ in range(k)]
+    comp_elegida = comp_arista[elegidas]
+    por_componente = np.argsort(comp_elegida, kind='stable')
+    elegidas = elegidas[por_componente]
+    cortes = np.searchsorted(comp_elegida[por_componente], np.arange(k + 1))
+    origenes = todas_o[elegidas].tolist()
+    destinos = todas_d[elegidas].tolist()
+    pesos = todas_p[elegidas].tolist()
+    for c in np.flatnonzero(cortes[1:] > cortes[:-1]).tolist():
+        a, b = cortes[c], cortes[c + 1]
+        mst = [(nombres[u], nombres[v], w) for u, v, w in zip(origenes[a:b], destinos[a:b], pesos[a:b])]
+        arboles[c] = (mst, sum(pesos[a:b]))
+
+    return arboles
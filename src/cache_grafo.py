@@ -0,0 +1,151 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+try:
+    from .grafo import Grafo, leer_grafo
+except ImportError:
+    from grafo import Grafo, leer_grafo
+
+
+# Cache binaria del grafo junto al CSV: <archivo>.csv.cache/ con un .npy por
+# arreglo (se abren con mmap), la tabla de nombres y la clave del CSV.
+VERSION_CACHE = 2
+MUESTRA_HASH = 1 << 20
+ARREGLOS = ('offsets', 'destinos', 'pesos', 'arista_csr')
+
+
+def ruta_cache(ruta_csv):
+    return ruta_csv + '.cache'
+
+
+# Clave del CSV: tamaño, fecha de modificación y hash del inicio y final
+# del archivo (hashear todo costaría casi lo mismo que leerlo)
+def clave_archivo(ruta_csv):
+    estado = os.stat(ruta_csv)
+    h = hashlib.blake2b(digest_size=16)
+    with open(ruta_csv, 'rb') as f:
+        h.update(f.read(MUESTRA_HASH))
+        if estado.st_size > 2 * MUESTRA_HASH:
+            f.seek(-MUESTRA_HASH, os.SEEK_END)
+            h.update(f.read(MUESTRA_HASH))
+    return {
+        'version': VERSION_CACHE,
+        'tamano': estado.st_size,
+        'mtime_ns': estado.st_mtime_ns,
+        'hash': h.hexdigest(),
+    }
+
+
+# Escribe la cache en un directorio temporal y lo renombra al final,
+# así una escritura a medias nunca se confunde con una cache válida
+def guardar_cache(grafo, ruta_csv, clave=None):
+    if clave is None:
+        clave = clave_archivo(ruta_csv)
+    destino = ruta_cache(ruta_csv)
+    temporal = f"{destino}.tmp{os.getpid()}"
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+
+    # Si algo falla (disco lleno, permisos) no queda el temporal a medias
+    try:
+        for nombre in ARREGLOS:
+            np.save(os.path.join(temporal, nombre + '.npy'), np.asarray(getattr(grafo, nombre)))
+
+        # Nombres como un solo texto más los límites de cada uno
+        limites = np.zeros(len(grafo.nombres) + 1, dtype=np.int64)
+        np.cumsum([len(n) for n in grafo.nombres], out=limites[1:])
+        with open(os.path.join(temporal, 'nombres.txt'), 'w', encoding='utf-8', newline='') as f:
+            f.write(''.join(grafo.nombres))
+        np.save(os.path.join(temporal, 'limites.npy'), limites)
+
+        with open(os.path.join(temporal, 'clave.json'), 'w', encoding='utf-8') as f:
+            json.dump(clave, f)
+
+        shutil.rmtree(destino, ignore_errors=True)
+        os.replace(temporal, destino)
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+# True si el proceso sigue vivo (puede estar escribiendo su temporal)
+def _proceso_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Existe pero es de otro usuario
+        return True
+    return True
+
+
+# Borra los temporales <archivo>.csv.cache.tmp<pid> que dejó un proceso que
+# terminó a mitad de guardar_cache (por ejemplo, si lo mataron)
+def limpiar_temporales(ruta_csv):
+    prefijo = ruta_cache(ruta_csv) + '.tmp'
+    for temporal in glob.glob(glob.escape(prefijo) + '*'):
+        pid = temporal[len(prefijo):]
+        if pid.isdigit() and int(pid) != os.getpid() and _proceso_vivo(int(pid)):
+            continue
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+# Carga el grafo desde la cache si sigue siendo válida; si no, devuelve None
+def cargar_cache(ruta_csv, clave=None):
+    directorio = ruta_cache(ruta_csv)
+    try:
+        with open(os.path.join(directorio, 'clave.json'), 'r', encoding='utf-8') as f:
+            guardada = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if clave is None:
+        clave = clave_archivo(ruta_csv)
+    if guardada != clave:
+        return None
+
+    try:
+        arreglos = [np.load(os.path.join(directorio, nombre + '.npy'), mmap_mode='r')
+                    for nombre in ARREGLOS]
+        with open(os.path.join(directorio, 'nombres.txt'), 'r', encoding='utf-8', newline='') as f:
+            texto = f.read()
+        limites = np.load(os.path.join(directorio, 'limites.npy')).tolist()
+    except (OSError, ValueError):
+        return None
+
+    nombres = [texto[a:b] for a, b in zip(limites, limites[1:])]
+    return Grafo.desde_arreglos(nombres, *arreglos)
+
+
+# Devuelve el grafo del CSV usando la cache cuando está al día; si no,
+# lee el CSV y deja la cache escrita para la próxima ejecución
+def cargar_grafo(ruta_csv, usar_cache=True):
+    if not usar_cache:
+        return leer_grafo(ruta_csv)
+
+    inicio = time.perf_counter()
+    clave = clave_archivo(ruta_csv)
+    grafo = cargar_cache(ruta_csv, clave)
+    if grafo is not None:
+        segundos = time.perf_counter() - inicio
+        grafo.estadisticas_carga = {
+            'filas': grafo.num_aristas,
+            'segundos': segundos,
+            'filas_por_segundo': grafo.num_aristas / segundos if segundos > 0 else float('inf'),
+            'cache': True,
+        }
+        return grafo
+
+    grafo = leer_grafo(ruta_csv)
+    limpiar_temporales(ruta_csv)
+    try:
+        guardar_cache(grafo, ruta_csv, clave)
+    except OSError as e:
+        print(f"Aviso: no se pudo escribir la cache ({e})")
+    return grafo
@@ -0,0 +1,128 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    from .dijkstra import dijkstra_ids
+    from .grafo import como_grafo
+except ImportError:
+    from dijkstra import dijkstra_ids
+    from grafo import como_grafo
+
+
+# Memoria por defecto para los árboles guardados (bytes)
+MEMORIA_POR_DEFECTO = 256 * 1024 * 1024
+# Distancias menores a esto se guardan exactas en float32
+LIMITE_FLOAT32 = 1 << 24
+
+
+# Cache LRU de árboles de caminos más cortos. La clave es (huella del
+# grafo, origen), así un grafo distinto o modificado nunca recibe árboles
+# viejos. Cada árbol se guarda como dos arreglos: distancias (float32 o
+# float64, inf = no alcanzable) y predecesores (int32, -1 = sin predecesor).
+class CacheArboles:
+    def __init__(self, memoria_max=MEMORIA_POR_DEFECTO):
+        self.memoria_max = memoria_max
+        self.memoria = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self._arboles = OrderedDict()
+        # id(grafo) -> última huella vista, para detectar grafos modificados
+        self._huellas = {}
+        self._candado = threading.Lock()
+
+    def __len__(self):
+        return len(self._arboles)
+
+    # Árbol desde `origen` como (dist, prev) indexados por id de nodo
+    def arbol(self, grafo, origen):
+        grafo = como_grafo(grafo)
+        if origen not in grafo:
+            raise KeyError(f"nodo '{origen}' no existe")
+        huella = grafo.huella
+        clave = (huella, grafo.indices[origen])
+
+        with self._candado:
+            anterior = self._huellas.get(id(grafo))
+            if anterior is not None and anterior != huella:
+                self._descartar(anterior)
+            self._huellas[id(grafo)] = huella
+
+            guardado = self._arboles.get(clave)
+            if guardado is not None:
+                self._arboles.move_to_end(clave)
+                self.aciertos += 1
+                return guardado
+            self.fallos += 1
+
+        dist, prev = dijkstra_ids(grafo, clave[1])
+        dist = np.array(dist, dtype=np.float64)
+        finitas = dist[np.isfinite(dist)]
+        if finitas.max() < LIMITE_FLOAT32:
+            dist = dist.astype(np.float32)
+        arbol = (dist, np.array(prev, dtype=np.int32))
+
+        with self._candado:
+            tamano = arbol[0].nbytes + arbol[1].nbytes
+            if tamano <= self.memoria_max and clave not in self._arboles:
+                self._arboles[clave] = arbol
+                self.memoria += tamano
+                while self.memoria > self.memoria_max:
+                    _, viejo = self._arboles.popitem(last=False)
+                    self.memoria -= viejo[0].nbytes + viejo[1].nbytes
+                    self.expulsiones += 1
+        return arbol
+
+    # ¿Está guardado el árbol de este origen? (no cuenta como acierto)
+    def contiene(self, grafo, origen):
+        grafo = como_grafo(grafo)
+        if origen not in grafo:
+            return False
+        with self._candado:
+            return (grafo.huella, grafo.indices[origen]) in self._arboles
+
+    # Distancia y ruta (con nombres) usando el árbol guardado del origen
+    def ruta(self, grafo, origen, destino):
+        grafo = como_grafo(grafo)
+        if destino not in grafo:
+            raise KeyError(f"nodo '{destino}' no existe")
+        dist, prev = self.arbol(grafo, origen)
+        t = grafo.indices[destino]
+        distancia = dist[t].item()
+        if distancia == float('inf'):
+            return distancia, []
+        camino = []
+        while t != -1:
+            camino.append(grafo.nombres[t])
+            t = int(prev[t])
+        return (int(distancia) if distancia.is_integer() else distancia), camino[::-1]
+
+    # Descarta los árboles de un grafo (o todos si no se indica)
+    def invalidar(self, grafo=None):
+        with self._candado:
+            if grafo is None:
+                self._arboles.clear()
+                self._huellas.clear()
+                self.memoria = 0
+            else:
+                grafo = como_grafo(grafo)
+                self._descartar(self._huellas.pop(id(grafo), grafo.huella))
+
+    def _descartar(self, huella):
+        for clave in [c for c in self._arboles if c[0] == huella]:
+            viejo = self._arboles.pop(clave)
+            self.memoria -= viejo[0].nbytes + viejo[1].nbytes
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'arboles': len(self._arboles),
+            'memoria': self.memoria,
+            'memoria_max': self.memoria_max,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'expulsiones': self.expulsiones,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+        }
@@ -0,0 +1,641 @@
+import io
+import os
+import struct
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    from .huffman import Nodo, construir_arbol, generar_codigos
+except ImportError:
+    from huffman import Nodo, construir_arbol, generar_codigos
+
+
+# Formato del archivo comprimido (enteros little-endian):
+#   cabecera: "HUF", versión (uint8), modo (uint8), cantidad de símbolos
+#             (uint32), cantidad de caracteres (uint64), bits de datos (uint64)
+#   tabla:    por símbolo, largo del símbolo en UTF-8 (uint8), el símbolo y
+#             largo del código (uint8); en la versión 1 sigue el código en
+#             ceil(largo/8) bytes, en la 2 los códigos son canónicos y se
+#             deducen de los largos (los símbolos van en orden canónico).
+#             En modo bytes son 256 largos (uint8, 0 = el byte no aparece).
+#   datos:    los códigos seguidos, el primer bit en el bit más alto de
+#             cada byte. En la versión 1 van todos juntos y el último byte
+#             se completa con ceros. En la 2 van en tramas de hasta
+#             TAM_TRAMA caracteres: cantidad de caracteres (uint32), bits de
+#             cada bloque de SIMBOLOS_POR_BLOQUE caracteres (uint16 c/u) y
+#             los bits de la trama completados a byte. Si la cantidad de
+#             caracteres de la cabecera es CANTIDAD_DESCONOCIDA (se comprimió
+#             un flujo en una pasada), una trama de 0 caracteres marca el fin.
+MAGIA = b'HUF'
+VERSION_CODIGOS = 1
+VERSION_CANONICA = 2
+MODO_TEXTO = 0
+MODO_BYTES = 1
+MODOS = {'texto': MODO_TEXTO, 'bytes': MODO_BYTES}
+CABECERA = struct.Struct('<3sBBIQQ')
+TRAMA = struct.Struct('<I')
+CANTIDAD_DESCONOCIDA = (1 << 64) - 1
+
+# Caracteres por trama (también lo que se lee por vez de la entrada)
+TAM_TRAMA = 1 << 20
+# Caracteres por bloque: el decodificador avanza todos los bloques de una
+# trama a la vez, uno por carril
+SIMBOLOS_POR_BLOQUE = 1024
+# Bits que resuelve cada consulta a la tabla del decodificador (como
+# máximo; los archivos chicos usan tablas más chicas)
+BITS_TABLA = 16
+# Largo máximo de código que se puede decodificar (ventanas de 64 bits
+# que empiezan en cualquier bit de un byte)
+LARGO_DECODIFICABLE = 57
+
+# Bytes que se cuentan por vez con bincount (convierte a enteros de 64 bits)
+TAM_CONTEO = 1 << 22
+
+# Bits de cada byte como texto, para recorrer los datos bit a bit
+_BITS_BYTE = [format(b, '08b') for b in range(256)]
+
+
+# Abre `destino` si es una ruta; los objetos archivo (por ejemplo
+# sys.stdin.buffer) se usan sin cerrarlos. En modo texto se usa UTF-8 sin
+# convertir saltos de línea para que la descompresión devuelva
+# exactamente los mismos bytes.
+@contextmanager
+def _abrir(destino, modo):
+    if isinstance(destino, (str, os.PathLike)):
+        if 'b' in modo:
+            with open(destino, modo) as f:
+                yield f
+        else:
+            with open(destino, modo, encoding='utf-8', newline='') as f:
+                yield f
+    elif 'b' in modo or isinstance(destino, io.TextIOBase):
+        yield destino
+    else:
+        f = io.TextIOWrapper(destino, encoding='utf-8', newline='')
+        try:
+            yield f
+        finally:
+            if 'w' in modo:
+                f.flush()
+            f.detach()
+
+
+def _leer_bytes(entrada, cantidad):
+    datos = entrada.read(cantidad)
+    if len(datos) != cantidad:
+        raise ValueError("Datos comprimidos incompletos")
+    return datos
+
+
+def _estadisticas(bytes_entrada, bytes_salida, segundos, bytes_texto):
+    return {
+        'bytes_entrada': bytes_entrada,
+        'bytes_salida': bytes_salida,
+        'segundos': segundos,
+        # MB/s siempre sobre el tamaño sin comprimir
+        'mb_por_segundo': bytes_texto / 1e6 / segundos if segundos > 0 else float('inf'),
+        'tasa': bytes_salida / bytes_entrada if bytes_entrada else 0.0,
+    }
+
+
+# Escribe el texto codificado en tramas. Cada bloque se arma como cadena
+# de '0'/'1' (su largo es el que va en la cabecera de la trama) y la trama
+# se convierte a bytes de una vez con int(..., 2).
+# Devuelve (bits de código sin el relleno, bytes escritos).
+def empaquetar(texto, codigos, salida, tam_trama=TAM_TRAMA):
+    total = 0
+    escritos = 0
+    try:
+        for i in range(0, len(texto), tam_trama):
+            trama = texto[i:i + tam_trama]
+            bloques = [''.join(map(codigos.__getitem__, trama[j:j + SIMBOLOS_POR_BLOQUE]))
+                       for j in range(0, len(trama), SIMBOLOS_POR_BLOQUE)]
+            bits = ''.join(bloques)
+            relleno = -len(bits) % 8
+            escritos += salida.write(TRAMA.pack(len(trama)))
+            escritos += salida.write(np.array([len(b) for b in bloques], dtype='<u2').tobytes())
+            escritos += salida.write(int(bits + '0' * relleno, 2).to_bytes((len(bits) + relleno) // 8, 'big'))
+            total += len(bits)
+    except KeyError as e:
+        raise ValueError(f"El carácter {e.args[0]!r} no está en la tabla de frecuencias") from None
+    return total, escritos
+
+
+# Empaqueta códigos seguidos (valores uint64 y largos, cada código de a lo
+# sumo LARGO_DECODIFICABLE bits). Con la suma acumulada de los largos se
+# sabe en qué bit empieza cada código; el código se desplaza a su lugar
+# dentro de una palabra de 64 bits que arranca en el byte donde empieza.
+# Los códigos que empiezan en el mismo byte no se pisan, así que se suman
+# con reduceat, y cada palabra se reparte en sus 8 bytes con OR.
+# Devuelve (bits de cada grupo de `por_bloque` códigos, bytes).
+def _empaquetar_codigos(valores, largos, por_bloque):
+    fin = np.cumsum(largos)
+    inicio = fin - largos
+    finales = fin[np.minimum(np.arange(por_bloque, len(largos) + por_bloque, por_bloque),
+                             len(largos)) - 1]
+    bits_bloques = np.diff(finales, prepend=0)
+
+    palabras_codigo = valores << (64 - (inicio & 7) - largos).astype(np.uint64)
+    byte_inicio = inicio >> 3
+    cortes = np.flatnonzero(np.diff(byte_inicio, prepend=-1))
+    palabras = np.zeros((int(fin[-1]) + 7) // 8, dtype=np.uint64)
+    palabras[byte_inicio[cortes]] = np.add.reduceat(palabras_codigo, cortes)
+    partes = palabras.astype('>u8').view(np.uint8).reshape(-1, 8)
+    empaquetado = np.zeros(len(palabras) + 8, dtype=np.uint8)
+    for j in range(8):
+        empaquetado[j:j + len(palabras)] |= partes[:, j]
+    return bits_bloques, empaquetado[:len(palabras)]
+
+
+# Versión vectorizada de empaquetar para bytes (mismo resultado byte a
+# byte): cada byte se cambia por su código y largo con arreglos de 256
+# entradas y se empaqueta con _empaquetar_codigos. Si el código de dos
+# bytes seguidos cabe en una palabra se usan tablas de 65536 pares, que
+# reducen a la mitad los elementos de cada operación.
+def empaquetar_bytes(datos, codigos, salida, tam_trama=TAM_TRAMA):
+    datos = np.frombuffer(datos, dtype=np.uint8)
+    largos = np.zeros(256, dtype=np.int64)
+    valores = np.zeros(256, dtype=np.uint64)
+    for simbolo, codigo in codigos.items():
+        largos[simbolo] = len(codigo)
+        valores[simbolo] = int(codigo, 2)
+    pares = 2 * int(largos.max()) <= LARGO_DECODIFICABLE
+    if pares:
+        largos_par = (largos[:, None] + largos[None, :]).ravel()
+        valores_par = ((valores[:, None] << largos[None, :].astype(np.uint64)) | valores[None, :]).ravel()
+
+    total = 0
+    escritos = 0
+    for i in range(0, len(datos), tam_trama):
+        trama = datos[i:i + tam_trama]
+        if not largos[trama].all():
+            faltante = int(trama[np.argmin(largos[trama])])
+            raise ValueError(f"El byte {faltante} no está en la tabla de frecuencias")
+        if pares and len(trama) % 2 == 0:
+            # Big-endian: el primer byte del par queda en la parte alta
+            indices = trama.view('>u2')
+            bits_bloques, empaquetado = _empaquetar_codigos(valores_par[indices], largos_par[indices],
+                                                            SIMBOLOS_POR_BLOQUE // 2)
+        else:
+            bits_bloques, empaquetado = _empaquetar_codigos(valores[trama], largos[trama],
+                                                            SIMBOLOS_POR_BLOQUE)
+        escritos += salida.write(TRAMA.pack(len(trama)))
+        escritos += salida.write(bits_bloques.astype('<u2').tobytes())
+        escritos += salida.write(empaquetado.tobytes())
+        total += int(bits_bloques.sum())
+    return total, escritos
+
+
+# Largos de código canónicos: símbolos ordenados por (largo, símbolo)
+def longitudes_codigo(codigos):
+    return sorted(((len(codigo), simbolo) for simbolo, codigo in codigos.items()))
+
+
+# Códigos canónicos a partir de [(largo, símbolo)] en orden canónico: cada
+# código es el anterior + 1, desplazado a la izquierda al crecer el largo
+def codigos_canonicos(longitudes):
+    codigos = {}
+    codigo = 0
+    largo_anterior = longitudes[0][0] if longitudes else 0
+    for largo, simbolo in longitudes:
+        codigo <<= largo - largo_anterior
+        codigos[simbolo] = format(codigo, f'0{largo}b')
+        codigo += 1
+        largo_anterior = largo
+    return codigos
+
+
+# Largos de código óptimos con un largo máximo (package-merge de
+# Larmore-Hirschberg). En cada nivel se empaquetan de a pares los elementos
+# del nivel más profundo y se mezclan con las hojas; de la lista del nivel
+# de arriba se eligen los 2n-2 más livianos. Cada vez que una hoja queda
+# elegida (directamente o dentro de un paquete elegido) su código crece en
+# un bit. Devuelve [(largo, símbolo)] en orden canónico.
+def longitudes_limitadas(frecuencias, largo_maximo):
+    simbolos = sorted(frecuencias, key=lambda s: (frecuencias[s], s))
+    n = len(simbolos)
+    if n <= 1:
+        return [(1, s) for s in simbolos]
+    if (1 << largo_maximo) < n:
+        raise ValueError(f"{n} símbolos no caben en códigos de {largo_maximo} bits")
+
+    hojas = np.array([frecuencias[s] for s in simbolos], dtype=np.int64)
+    # es_hoja[i]: qué elementos de la lista mezclada del nivel i son hojas
+    es_hoja = []
+    lista = hojas
+    es_hoja.append(np.ones(n, dtype=bool))
+    for _ in range(largo_maximo - 1):
+        paquetes = lista[0:len(lista) - 1:2] + lista[1::2]
+        mezcla = np.concatenate((hojas, paquetes))
+        # Estable: ante empate la hoja queda antes que el paquete
+        orden = np.argsort(mezcla, kind='stable')
+        lista = mezcla[orden]
+        es_hoja.append(orden < n)
+
+    largos = np.zeros(n, dtype=np.int64)
+    elegidos = 2 * n - 2
+    for hoja in reversed(es_hoja):
+        # Las hojas elegidas son siempre las más livianas
+        cuantas = int(hoja[:elegidos].sum())
+        largos[:cuantas] += 1
+        elegidos = 2 * (elegidos - cuantas)
+    return sorted(zip(largos.tolist(), simbolos))
+
+
+def _escribir_longitudes(salida, longitudes):
+    escritos = 0
+    for largo, simbolo in longitudes:
+        crudo = simbolo.encode('utf-8')
+        escritos += salida.write(struct.pack('<B', len(crudo)) + crudo + struct.pack('<B', largo))
+    return escritos
+
+
+def _escribir_longitudes_bytes(salida, longitudes):
+    largos = np.zeros(256, dtype=np.uint8)
+    for largo, simbolo in longitudes:
+        largos[simbolo] = largo
+    return salida.write(largos.tobytes())
+
+
+def _leer_longitudes_bytes(entrada):
+    largos = _leer_bytes(entrada, 256)
+    return sorted((largo, simbolo) for simbolo, largo in enumerate(largos) if largo)
+
+
+def _leer_longitudes(entrada, cantidad):
+    longitudes = []
+    for _ in range(cantidad):
+        largo = _leer_bytes(entrada, 1)[0]
+        crudo = _leer_bytes(entrada, largo + 1)
+        longitudes.append((crudo[-1], crudo[:-1].decode('utf-8')))
+    return longitudes
+
+
+def _leer_tabla(entrada, cantidad):
+    codigos = {}
+    for _ in range(cantidad):
+        largo = _leer_bytes(entrada, 1)[0]
+        simbolo = _leer_bytes(entrada, largo).decode('utf-8')
+        bits = _leer_bytes(entrada, 1)[0]
+        valor = int.from_bytes(_leer_bytes(entrada, (bits + 7) // 8), 'big')
+        codigos[simbolo] = format(valor, f'0{bits}b') if bits else ''
+    return codigos
+
+
+# Rearma el árbol a partir de los códigos de la tabla (archivos versión 1)
+def arbol_desde_codigos(codigos):
+    raiz = Nodo()
+    for simbolo, codigo in codigos.items():
+        nodo = raiz
+        for bit in codigo:
+            if bit == '0':
+                if nodo.izquierdo is None:
+                    nodo.izquierdo = Nodo()
+                nodo = nodo.izquierdo
+            else:
+                if nodo.derecho is None:
+                    nodo.derecho = Nodo()
+                nodo = nodo.derecho
+        nodo.simbolo = simbolo
+    return raiz
+
+
+# Decodifica recorriendo el árbol bit a bit desde la raíz
+def _decodificar_arbol(datos, cantidad, raiz):
+    simbolos = []
+    nodo = raiz
+    for byte in datos:
+        for bit in _BITS_BYTE[byte]:
+            nodo = nodo.derecho if bit == '1' else nodo.izquierdo
+            if nodo.simbolo is not None:
+                simbolos.append(nodo.simbolo)
+                if len(simbolos) == cantidad:
+                    return ''.join(simbolos)
+                nodo = raiz
+    return ''.join(simbolos)
+
+
+# Decodificador por tabla para códigos canónicos. Cada entrada de la tabla
+# corresponde a los próximos k bits y guarda los símbolos completos que
+# caben en ellos y cuántos bits ocupan, así una consulta resuelve varios
+# símbolos. Los códigos de más de k bits se resuelven con el primer código
+# de cada largo (decodificación canónica).
+# Los bloques de una trama empiezan en bits conocidos, así que se avanzan
+# todos juntos con NumPy: cada paso hace una consulta por bloque.
+class DecodificadorCanonico:
+    def __init__(self, longitudes, bits_tabla=BITS_TABLA):
+        self.simbolos = [simbolo for _, simbolo in longitudes]
+        self.largo_maximo = max((largo for largo, _ in longitudes), default=0)
+        if self.largo_maximo > LARGO_DECODIFICABLE:
+            raise ValueError(f"Códigos de más de {LARGO_DECODIFICABLE} bits no soportados")
+        self.k = k = bits_tabla
+        # Valor de cada símbolo: punto de código (caracteres) o el byte
+        self.valores = np.array([simbolo if isinstance(simbolo, int) else ord(simbolo)
+                                 for simbolo in self.simbolos], dtype=np.uint32)
+
+        # Primer código, cantidad y posición del primer símbolo de cada largo
+        self.primero = np.zeros(self.largo_maximo + 1, dtype=np.int64)
+        self.cantidad = np.zeros(self.largo_maximo + 1, dtype=np.int64)
+        self.inicio = np.zeros(self.largo_maximo + 1, dtype=np.int64)
+        codigo = 0
+        largos = [largo for largo, _ in longitudes]
+        for largo in range(1, self.largo_maximo + 1):
+            self.primero[largo] = codigo
+            self.inicio[largo] = self.cantidad.sum()
+            self.cantidad[largo] = largos.count(largo)
+            codigo = (codigo + int(self.cantidad[largo])) << 1
+
+        # Un símbolo por ventana de k bits (-1 si el código es más largo)
+        indice = np.full(1 << k, -1, dtype=np.int32)
+        largo_ventana = np.zeros(1 << k, dtype=np.int64)
+        for i, largo in enumerate(largos):
+            if largo > k:
+                break
+            codigo = int(self.primero[largo]) + i - int(self.inicio[largo])
+            desde, hasta = codigo << (k - largo), (codigo + 1) << (k - largo)
+            indice[desde:hasta] = i
+            largo_ventana[desde:hasta] = largo
+
+        # Varios símbolos por ventana: seguir decodificando lo que queda
+        ventanas = np.arange(1 << k, dtype=np.int64)
+        usados = np.zeros(1 << k, dtype=np.int64)
+        activos = np.ones(1 << k, dtype=bool)
+        columnas = []
+        mascara = (1 << k) - 1
+        while True:
+            w = (ventanas << usados) & mascara
+            largo = largo_ventana[w]
+            activos &= (largo > 0) & (usados + largo <= k)
+            if not activos.any():
+                break
+            columnas.append(np.where(activos, indice[w], -1))
+            usados += np.where(activos, largo, 0)
+
+        # Filas extra: (1 << k) + i es el símbolo i solo (códigos largos) y
+        # la última no tiene símbolos (bloques que ya terminaron)
+        self.vacia = (1 << k) + len(largos)
+        self.tabla = np.full((self.vacia + 1, max(1, len(columnas))), -1, dtype=np.int32)
+        if columnas:
+            self.tabla[:1 << k] = np.column_stack(columnas)
+        self.tabla[1 << k:self.vacia, 0] = np.arange(len(largos))
+        self.usados = usados
+
+        # Fin (alineado a la izquierda en LARGO_DECODIFICABLE bits) de los
+        # códigos de cada largo, para buscar el largo con searchsorted
+        desplazamiento = LARGO_DECODIFICABLE - np.arange(1, self.largo_maximo + 1)
+        self.limites = (self.primero[1:] + self.cantidad[1:]) << desplazamiento
+
+    # Símbolo y largo de los códigos largos que empiezan en los bits
+    # `posiciones` de `datos` (uint8 con al menos 8 bytes de relleno)
+    def _largos(self, datos, posiciones):
+        indices = posiciones >> 3
+        palabra = np.zeros(len(posiciones), dtype=np.uint64)
+        for j in range(8):
+            palabra |= datos[indices + j].astype(np.uint64) << np.uint64(56 - 8 * j)
+        palabra <<= (posiciones & 7).astype(np.uint64)
+        ventana = (palabra >> np.uint64(64 - LARGO_DECODIFICABLE)).astype(np.int64)
+        largo = np.minimum(np.searchsorted(self.limites, ventana, side='right') + 1, self.largo_maximo)
+        codigo = ventana >> (LARGO_DECODIFICABLE - largo)
+        simbolo = self.inicio[largo] + codigo - self.primero[largo]
+        # Ventanas que no empiezan con ningún código: largo 0 (inválidas)
+        largo = np.where(ventana < self.limites[-1], largo, 0)
+        return np.clip(simbolo, 0, len(self.simbolos) - 1), largo
+
+    # Decodifica una trama: `bits_bloques` son los bits de cada bloque y
+    # `cantidad` los símbolos de la trama. Devuelve índices de símbolos.
+    def decodificar_trama(self, datos, bits_bloques, cantidad):
+        k = self.k
+        datos = np.concatenate((np.frombuffer(datos, dtype=np.uint8), np.zeros(8, dtype=np.uint8)))
+        # Los 24 bits que empiezan en cada byte: alcanzan para k + 7 bits
+        cortos = datos.astype(np.int64)
+        palabras = (cortos[:-2] << 16) | (cortos[1:-1] << 8) | cortos[2:]
+
+        fin = np.cumsum(bits_bloques, dtype=np.int64)
+        pos = fin - bits_bloques
+        activos = pos < fin
+        claves = []
+        while activos.any():
+            w = (palabras[pos >> 3] >> (24 - k - (pos & 7))) & ((1 << k) - 1)
+            avance = self.usados[w]
+            if self.largo_maximo > k:
+                largas = np.flatnonzero((avance == 0) & activos)
+                if len(largas):
+                    simbolo, largo = self._largos(datos, pos[largas])
+                    w[largas] = (1 << k) + simbolo
+                    avance[largas] = largo
+            # Ningún código coincide: los datos están dañados (y el bloque
+            # no avanzaría nunca)
+            if np.any((avance == 0) & activos):
+                raise ValueError("Datos comprimidos inválidos")
+            w[~activos] = self.vacia
+            avance[~activos] = 0
+            claves.append(w)
+            pos += avance
+            activos = pos < fin
+        if not claves:
+            return np.empty(0, dtype=np.int32)
+
+        # Símbolos de cada bloque en orden; la última consulta de un bloque
+        # puede leer símbolos del bloque siguiente: se descartan contando
+        filas = self.tabla[np.column_stack(claves)].reshape(len(fin), -1)
+        validos = filas >= 0
+        indices = filas[validos]
+        esperados = np.full(len(fin), SIMBOLOS_POR_BLOQUE)
+        esperados[-1] = cantidad - SIMBOLOS_POR_BLOQUE * (len(fin) - 1)
+        finales = np.cumsum(validos.sum(axis=1))
+        sobran = finales - np.cumsum(esperados)
+        sobran -= np.concatenate(([0], sobran[:-1]))
+        # Un bloque con menos símbolos que los esperados: los bits no
+        # corresponden a la cantidad de caracteres
+        if (sobran < 0).any():
+            raise ValueError("Datos comprimidos inválidos")
+        if sobran.any():
+            quedan = np.ones(len(indices), dtype=bool)
+            desde = np.repeat(finales - sobran, sobran)
+            quedan[desde + np.arange(len(desde)) - np.repeat(np.cumsum(sobran) - sobran, sobran)] = False
+            indices = indices[quedan]
+        return indices
+
+
+# Lee las tramas de `entrada` hasta juntar `cantidad` caracteres (o hasta
+# la trama vacía si la cantidad es desconocida). Genera (datos, bits de
+# cada bloque, caracteres) de a una trama.
+def _leer_tramas(entrada, cantidad):
+    restantes = cantidad
+    while restantes > 0:
+        (en_trama,) = TRAMA.unpack(_leer_bytes(entrada, TRAMA.size))
+        if en_trama == 0 and cantidad == CANTIDAD_DESCONOCIDA:
+            return
+        if en_trama == 0 or en_trama > restantes:
+            raise ValueError("Datos comprimidos inválidos")
+        bloques = -(-en_trama // SIMBOLOS_POR_BLOQUE)
+        bits_bloques = np.frombuffer(_leer_bytes(entrada, 2 * bloques), dtype='<u2').astype(np.int64)
+        datos = _leer_bytes(entrada, (int(bits_bloques.sum()) + 7) // 8)
+        yield datos, bits_bloques, en_trama
+        restantes -= en_trama
+
+
+# Frecuencias de los caracteres de un texto leído de a TAM_TRAMA
+# caracteres (ruta u objeto archivo)
+def contar_frecuencias(entrada):
+    frecuencias = Counter()
+    with _abrir(entrada, 'r') as f:
+        while True:
+            trozo = f.read(TAM_TRAMA)
+            if not trozo:
+                break
+            frecuencias.update(trozo)
+    return dict(frecuencias)
+
+
+# Frecuencias de los bytes con bincount. Una ruta se recorre mapeada en
+# memoria (np.memmap); un objeto archivo, leyendo de a TAM_CONTEO bytes.
+def contar_frecuencias_bytes(entrada):
+    conteo = np.zeros(256, dtype=np.int64)
+    if isinstance(entrada, (str, os.PathLike)):
+        if os.path.getsize(entrada):
+            datos = np.memmap(entrada, dtype=np.uint8, mode='r')
+            for i in range(0, len(datos), TAM_CONTEO):
+                conteo += np.bincount(datos[i:i + TAM_CONTEO], minlength=256)
+            del datos
+    else:
+        while True:
+            trozo = entrada.read(TAM_CONTEO)
+            if not trozo:
+                break
+            conteo += np.bincount(np.frombuffer(trozo, dtype=np.uint8), minlength=256)
+    return {simbolo: c for simbolo, c in enumerate(conteo.tolist()) if c}
+
+
+# Comprime con códigos de Huffman canónicos, de a una trama por vez (la
+# memoria no depende del tamaño). modo='texto' codifica los caracteres de
+# un texto UTF-8; modo='bytes' los bytes de cualquier archivo, con conteo
+# y codificación vectorizados con NumPy.
+# `entrada` y `salida` son rutas u objetos archivo. Sin `frecuencias` se
+# cuentan en una primera pasada (la entrada tiene que poder releerse); con
+# ellas ({símbolo: frecuencia}) se comprime en una sola pasada, por ejemplo
+# desde la entrada estándar. Con largo_maximo los códigos no pasan de ese
+# largo (package-merge); sin él solo se limitan si el árbol excede lo que
+# el decodificador acepta. Devuelve estadísticas (bytes, segundos, MB/s,
+# tasa, largo máximo y cuánto más ocupan los datos que con el árbol).
+def comprimir(entrada, salida, largo_maximo=None, frecuencias=None, modo='texto'):
+    if modo not in MODOS:
+        raise ValueError(f"Modo desconocido: {modo}")
+    bytes_ = modo == 'bytes'
+    inicio = time.perf_counter()
+    una_pasada = frecuencias is not None
+    with _abrir(entrada, 'rb' if bytes_ else 'r') as f_entrada, _abrir(salida, 'wb') as f_salida:
+        if not una_pasada:
+            if not f_entrada.seekable():
+                raise ValueError("La entrada no se puede releer: indique las frecuencias")
+            if bytes_:
+                frecuencias = contar_frecuencias_bytes(entrada if isinstance(entrada, (str, os.PathLike))
+                                                       else f_entrada)
+            else:
+                frecuencias = contar_frecuencias(f_entrada)
+            f_entrada.seek(0)
+        frecuencias = {s: f for s, f in frecuencias.items() if f > 0}
+
+        longitudes = longitudes_codigo(generar_codigos(construir_arbol(frecuencias)))
+        bits_arbol = sum(frecuencias[s] * largo for largo, s in longitudes)
+        tope = LARGO_DECODIFICABLE if largo_maximo is None else min(largo_maximo, LARGO_DECODIFICABLE)
+        if longitudes and longitudes[-1][0] > tope:
+            longitudes = longitudes_limitadas(frecuencias, tope)
+        codigos = codigos_canonicos(longitudes)
+        bits_tabla = sum(frecuencias[s] * largo for largo, s in longitudes)
+
+        # En una pasada la cantidad real no se conoce hasta el final
+        if una_pasada:
+            cantidad, bits = CANTIDAD_DESCONOCIDA, 0
+        else:
+            cantidad, bits = sum(frecuencias.values()), bits_tabla
+        bytes_salida = f_salida.write(CABECERA.pack(MAGIA, VERSION_CANONICA, MODOS[modo],
+                                                    len(codigos), cantidad, bits))
+        if bytes_:
+            bytes_salida += _escribir_longitudes_bytes(f_salida, longitudes)
+        else:
+            bytes_salida += _escribir_longitudes(f_salida, longitudes)
+
+        bytes_texto = 0
+        while True:
+            trozo = f_entrada.read(TAM_TRAMA)
+            if not trozo:
+                break
+            if bytes_:
+                bytes_texto += len(trozo)
+                bytes_salida += empaquetar_bytes(trozo, codigos, f_salida)[1]
+            else:
+                bytes_texto += len(trozo.encode('utf-8'))
+                bytes_salida += empaquetar(trozo, codigos, f_salida)[1]
+        if una_pasada:
+            bytes_salida += f_salida.write(TRAMA.pack(0))
+        f_salida.flush()
+
+    estadisticas = _estadisticas(bytes_texto, bytes_salida, time.perf_counter() - inicio, bytes_texto)
+    estadisticas['largo_maximo'] = longitudes[-1][0] if longitudes else 0
+    estadisticas['penalizacion'] = (bits_tabla - bits_arbol) / bits_arbol if bits_arbol else 0.0
+    return estadisticas
+
+
+# Restaura el archivo original a partir de uno creado con comprimir (en el
+# modo con que se comprimió), de a una trama por vez. `entrada` y `salida`
+# son rutas u objetos archivo.
+def descomprimir(entrada, salida):
+    inicio = time.perf_counter()
+    with _abrir(entrada, 'rb') as f_entrada:
+        cabecera = f_entrada.read(CABECERA.size)
+        if len(cabecera) != CABECERA.size or cabecera[:3] != MAGIA:
+            raise ValueError("El archivo no es un archivo comprimido con Huffman")
+        _, version, modo, num_simbolos, cantidad, bits = CABECERA.unpack(cabecera)
+        if (version, modo) not in ((VERSION_CODIGOS, MODO_TEXTO), (VERSION_CANONICA, MODO_TEXTO),
+                                   (VERSION_CANONICA, MODO_BYTES)):
+            raise ValueError(f"Versión de archivo no soportada: {version}")
+        bytes_ = modo == MODO_BYTES
+
+        with _abrir(salida, 'wb' if bytes_ else 'w') as f_salida:
+            bytes_entrada = CABECERA.size
+            bytes_texto = 0
+            leidos = 0
+            if version == VERSION_CANONICA:
+                if bytes_:
+                    longitudes = _leer_longitudes_bytes(f_entrada)
+                    bytes_entrada += 256
+                else:
+                    longitudes = _leer_longitudes(f_entrada, num_simbolos)
+                    bytes_entrada += sum(2 + len(s.encode('utf-8')) for _, s in longitudes)
+                # Tabla de 2^k entradas: para pocos datos no conviene una grande
+                k = min(BITS_TABLA, max(8, bits.bit_length() - 4)) if bits else BITS_TABLA
+                decodificador = DecodificadorCanonico(longitudes, k) if longitudes else None
+                for datos, bits_bloques, en_trama in _leer_tramas(f_entrada, cantidad):
+                    if decodificador is None:
+                        raise ValueError("Datos comprimidos inválidos")
+                    valores = decodificador.valores[decodificador.decodificar_trama(datos, bits_bloques, en_trama)]
+                    if len(valores) != en_trama:
+                        raise ValueError("Datos comprimidos inválidos")
+                    if bytes_:
+                        trozo = valores.astype(np.uint8).tobytes()
+                        bytes_texto += len(trozo)
+                    else:
+                        trozo = valores.astype('<u4').tobytes().decode('utf-32-le')
+                        bytes_texto += len(trozo.encode('utf-8'))
+                    f_salida.write(trozo)
+                    bytes_entrada += TRAMA.size + 2 * len(bits_bloques) + len(datos)
+                    leidos += en_trama
+                if cantidad == CANTIDAD_DESCONOCIDA:
+                    bytes_entrada += TRAMA.size
+                    cantidad = leidos
+            elif cantidad:
+                codigos = _leer_tabla(f_entrada, num_simbolos)
+                datos = _leer_bytes(f_entrada, (bits + 7) // 8)
+                texto = _decodificar_arbol(datos, cantidad, arbol_desde_codigos(codigos))
+                f_salida.write(texto)
+                bytes_entrada = f_entrada.tell() if f_entrada.seekable() else bytes_entrada + len(datos)
+                bytes_texto = len(texto.encode('utf-8'))
+                leidos = len(texto)
+            if leidos != cantidad:
+                raise ValueError("Datos comprimidos incompletos")
+
+    return _estadisticas(bytes_entrada, bytes_texto, time.perf_counter() - inicio, bytes_texto)
@@ -0,0 +1,237 @@
+import heapq
+from functools import cached_property
+
+import numpy as np
+
+try:
+    from .grafo import como_grafo
+except ImportError:
+    from grafo import como_grafo
+
+
+# Nodos que puede fijar cada búsqueda de testigos; si se corta antes de
+# encontrar un testigo se agrega el atajo (es seguro, solo sobra una arista)
+LIMITE_TESTIGOS = 60
+
+
+# Dijkstra acotado desde u en el grafo que queda, sin pasar por `excluido`
+def _testigos(adyacencia, u, excluido, limite_dist, limite_nodos):
+    dist = {u: 0}
+    heap = [(0, u)]
+    fijados = 0
+    while heap and fijados < limite_nodos:
+        d, x = heapq.heappop(heap)
+        if d > limite_dist:
+            break
+        if d > dist[x]:
+            continue
+        fijados += 1
+        for y, w in adyacencia[x].items():
+            if y == excluido:
+                continue
+            nd = d + w
+            if nd < dist.get(y, float('inf')):
+                dist[y] = nd
+                heapq.heappush(heap, (nd, y))
+    return dist
+
+
+# Atajos necesarios al contraer v: (u, x, peso) para cada par de vecinos
+# cuyo camino más corto pasa por v
+def _atajos(adyacencia, v, limite_nodos):
+    vecinos = list(adyacencia[v].items())
+    atajos = []
+    for i, (u, wu) in enumerate(vecinos):
+        resto = vecinos[i + 1:]
+        if not resto:
+            break
+        limite = wu + max(w for _, w in resto)
+        dist = _testigos(adyacencia, u, v, limite, limite_nodos)
+        for x, wx in resto:
+            if dist.get(x, float('inf')) > wu + wx:
+                atajos.append((u, x, wu + wx))
+    return atajos
+
+
+# Jerarquía de contracción: cada nodo tiene un rango y se guardan solo las
+# aristas "hacia arriba" (al nodo de mayor rango), incluidos los atajos.
+# Las aristas están en formato CSR (offsets/destinos/pesos) y medios[i] es
+# el nodo que reemplaza el atajo i (-1 para aristas originales).
+class JerarquiaContraccion:
+    def __init__(self, grafo, rango, offsets, destinos, pesos, medios):
+        self.grafo = como_grafo(grafo)
+        self.rango = np.asarray(rango)
+        self.offsets = np.asarray(offsets)
+        self.destinos = np.asarray(destinos)
+        self.pesos = np.asarray(pesos)
+        self.medios = np.asarray(medios)
+        self.explorados = 0
+
+    # Aristas hacia arriba como listas de Python por nodo: (destinos, pesos,
+    # medios). Se arman una vez y evitan indexar numpy en cada consulta.
+    @cached_property
+    def _subidas(self):
+        cortes = self.offsets.tolist()
+        destinos, pesos, medios = self.destinos.tolist(), self.pesos.tolist(), self.medios.tolist()
+        return [(destinos[a:b], pesos[a:b], medios[a:b]) for a, b in zip(cortes, cortes[1:])]
+
+    @property
+    def num_atajos(self):
+        return int(np.count_nonzero(self.medios >= 0))
+
+    # Fase offline: ordena los nodos por diferencia de aristas (atajos que
+    # agrega menos aristas que quita, más vecinos ya contraídos) con
+    # actualización perezosa y los contrae en ese orden
+    @classmethod
+    def construir(cls, grafo, limite_testigos=LIMITE_TESTIGOS):
+        grafo = como_grafo(grafo)
+        n = len(grafo)
+
+        # Grafo superpuesto: una arista por par con el menor peso, sin lazos
+        adyacencia = [dict() for _ in range(n)]
+        for u, v, w in zip(*(a.tolist() for a in grafo.aristas_ids())):
+            if u != v and w < adyacencia[u].get(v, float('inf')):
+                adyacencia[u][v] = w
+                adyacencia[v][u] = w
+        medio = {}
+        borrados = [0] * n
+
+        def prioridad(v):
+            return len(_atajos(adyacencia, v, limite_testigos)) - len(adyacencia[v]) + borrados[v]
+
+        heap = [(prioridad(v), v) for v in range(n)]
+        heapq.heapify(heap)
+
+        rango = np.zeros(n, dtype=np.int32)
+        subidas = [None] * n
+        siguiente = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            actual = prioridad(v)
+            if heap and actual > heap[0][0]:
+                heapq.heappush(heap, (actual, v))
+                continue
+
+            for u, x, w in _atajos(adyacencia, v, limite_testigos):
+                if w < adyacencia[u].get(x, float('inf')):
+                    adyacencia[u][x] = w
+                    adyacencia[x][u] = w
+                    medio[(u, x) if u < x else (x, u)] = v
+
+            # Los vecinos que quedan tienen mayor rango: son sus aristas hacia arriba
+            rango[v] = siguiente
+            siguiente += 1
+            subidas[v] = [(u, w, medio.get((u, v) if u < v else (v, u), -1))
+                          for u, w in adyacencia[v].items()]
+            for u in adyacencia[v]:
+                del adyacencia[u][v]
+                borrados[u] += 1
+            adyacencia[v] = {}
+
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in subidas], out=offsets[1:])
+        planas = [arista for s in subidas for arista in s]
+        destinos = np.array([a[0] for a in planas], dtype=np.int32)
+        pesos = np.array([a[1] for a in planas], dtype=np.int64)
+        medios = np.array([a[2] for a in planas], dtype=np.int32)
+        return cls(grafo, rango, offsets, destinos, pesos, medios)
+
+    def guardar(self, ruta):
+        with open(ruta, 'wb') as f:
+            np.savez(f, rango=self.rango, offsets=self.offsets, destinos=self.destinos,
+                     pesos=self.pesos, medios=self.medios, huella=np.array(self.grafo.huella))
+
+    # Carga un índice guardado; falla si se construyó con otro grafo
+    @classmethod
+    def cargar(cls, ruta, grafo):
+        grafo = como_grafo(grafo)
+        with np.load(ruta) as datos:
+            if str(datos['huella']) != grafo.huella:
+                raise ValueError("La jerarquía no corresponde a este grafo")
+            return cls(grafo, datos['rango'], datos['offsets'], datos['destinos'],
+                       datos['pesos'], datos['medios'])
+
+    # Medio de la arista entre a y b (la guarda el de menor rango)
+    def _medio(self, a, b):
+        if self.rango[a] > self.rango[b]:
+            a, b = b, a
+        destinos, _, medios = self._subidas[a]
+        return medios[destinos.index(b)]
+
+    # Expande la arista (a, b) a la secuencia de nodos originales sin a
+    def _desempacar(self, a, b):
+        camino = []
+        pila = [(a, b)]
+        while pila:
+            x, y = pila.pop()
+            m = self._medio(x, y)
+            if m < 0:
+                camino.append(y)
+            else:
+                pila.append((m, y))
+                pila.append((x, m))
+        return camino
+
+    # Búsqueda bidireccional solo hacia arriba: (distancia, ruta con nombres),
+    # la misma distancia que algoritmo_dijkstra y la ruta completa
+    def consulta(self, origen, destino):
+        grafo = self.grafo
+        for nodo in (origen, destino):
+            if nodo not in grafo:
+                print(f"Error: nodo '{nodo}' no existe")
+                return float('inf'), []
+        s, t = grafo.indices[origen], grafo.indices[destino]
+        subidas = self._subidas
+
+        dist = ({s: 0}, {t: 0})
+        prev = ({s: -1}, {t: -1})
+        heaps = ([(0, s)], [(0, t)])
+        mejor = 0 if s == t else float('inf')
+        encuentro = s if s == t else -1
+        self.explorados = 0
+
+        while heaps[0] or heaps[1]:
+            # Un lado termina cuando su mínimo ya no puede mejorar el resultado
+            for lado in (0, 1):
+                if heaps[lado] and heaps[lado][0][0] >= mejor:
+                    heaps[lado].clear()
+            lados = [l for l in (0, 1) if heaps[l]]
+            if not lados:
+                break
+            lado = min(lados, key=lambda l: heaps[l][0][0])
+
+            d, u = heapq.heappop(heaps[lado])
+            if d > dist[lado][u]:
+                continue
+            self.explorados += 1
+            otra = dist[1 - lado].get(u)
+            if otra is not None and d + otra < mejor:
+                mejor = d + otra
+                encuentro = u
+
+            dist_lado, prev_lado = dist[lado], prev[lado]
+            destinos, pesos, _ = subidas[u]
+            for v, w in zip(destinos, pesos):
+                nd = d + w
+                if nd < dist_lado.get(v, float('inf')):
+                    dist_lado[v] = nd
+                    prev_lado[v] = u
+                    heapq.heappush(heaps[lado], (nd, v))
+
+        if encuentro == -1:
+            return float('inf'), []
+
+        # Subir desde el encuentro hasta cada extremo y desempacar los atajos
+        subida = [encuentro]
+        while prev[0][subida[-1]] != -1:
+            subida.append(prev[0][subida[-1]])
+        subida.reverse()
+        bajada = [encuentro]
+        while prev[1][bajada[-1]] != -1:
+            bajada.append(prev[1][bajada[-1]])
+        tramos = subida + bajada[1:]
+
+        camino = [tramos[0]]
+        for a, b in zip(tramos, tramos[1:]):
+            camino.extend(self._desempacar(a, b))
+        return mejor, [grafo.nombres[v] for v in camino]
@@ -0,0 +1,217 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from .grafo import como_grafo
+except ImportError:
+    from grafo import como_grafo
+
+
+# Distancia "infinita" entera (al devolver se cambia por inf)
+_SIN_DISTANCIA = np.int64(1) << 62
+# Bajo este número de aristas a relajar en una fase no compensa repartir
+UMBRAL_PARALELO = 1 << 18
+
+# Aristas ligeras y pesadas de cada proceso trabajador (se reciben una
+# vez al iniciar el pool)
+_aristas_trabajador = None
+
+
+def _iniciar_trabajador(ligeras, pesadas):
+    global _aristas_trabajador
+    _aristas_trabajador = {'ligeras': ligeras, 'pesadas': pesadas}
+
+
+# Posiciones de las aristas de los nodos `fuentes` en un CSR y el nodo al
+# que pertenece cada una, sin recorrer nodo por nodo
+def _expandir(offsets, fuentes):
+    inicios = offsets[fuentes]
+    cantidades = offsets[fuentes + 1] - inicios
+    total = int(cantidades.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    desplazamiento = np.repeat(inicios - np.cumsum(cantidades) + cantidades, cantidades)
+    return desplazamiento + np.arange(total), np.repeat(fuentes, cantidades)
+
+
+# Candidatos (destino, distancia, origen) al relajar las aristas de
+# `fuentes`, dejando el mejor por destino
+def _candidatos(offsets, destinos, pesos, fuentes, dist_fuentes):
+    posiciones, duenos = _expandir(offsets, fuentes)
+    if not len(posiciones):
+        return posiciones, posiciones, posiciones
+    v = destinos[posiciones].astype(np.int64)
+    nd = np.repeat(dist_fuentes, offsets[fuentes + 1] - offsets[fuentes]) + pesos[posiciones]
+    orden = np.lexsort((nd, v))
+    v, nd, duenos = v[orden], nd[orden], duenos[orden]
+    primero = np.ones(len(v), dtype=bool)
+    primero[1:] = v[1:] != v[:-1]
+    return v[primero], nd[primero], duenos[primero]
+
+
+def _candidatos_trabajador(tipo, fuentes, dist_fuentes):
+    return _candidatos(*_aristas_trabajador[tipo], fuentes, dist_fuentes)
+
+
+# Relaja las aristas de `fuentes` (tipo 'ligeras' o 'pesadas') y aplica
+# las mejoras. Devuelve los nodos cuya distancia bajó.
+def _relajar(aristas, tipo, fuentes, dist, prev, pool, procesos):
+    offsets = aristas[tipo][0]
+    if pool is not None and int((offsets[fuentes + 1] - offsets[fuentes]).sum()) >= UMBRAL_PARALELO:
+        partes = [p for p in np.array_split(fuentes, procesos) if len(p)]
+        trabajos = [pool.submit(_candidatos_trabajador, tipo, p, dist[p]) for p in partes]
+        resultados = [t.result() for t in trabajos]
+        v = np.concatenate([r[0] for r in resultados])
+        nd = np.concatenate([r[1] for r in resultados])
+        u = np.concatenate([r[2] for r in resultados])
+        # Un destino puede venir de varias partes: quedarse con el mejor
+        orden = np.lexsort((nd, v))
+        v, nd, u = v[orden], nd[orden], u[orden]
+        primero = np.ones(len(v), dtype=bool)
+        primero[1:] = v[1:] != v[:-1]
+        v, nd, u = v[primero], nd[primero], u[primero]
+    else:
+        v, nd, u = _candidatos(*aristas[tipo], fuentes, dist[fuentes])
+    mejora = nd < dist[v]
+    v = v[mejora]
+    dist[v] = nd[mejora]
+    prev[v] = u[mejora]
+    return v
+
+
+# Agrega a `pendientes` los nodos de `nodos` que todavía no están
+def _agregar(pendientes, en_espera, nodos):
+    nodos = nodos[~en_espera[nodos]]
+    if not len(nodos):
+        return pendientes
+    en_espera[nodos] = True
+    return np.concatenate((pendientes, nodos))
+
+
+# Separa el CSR en aristas ligeras (peso <= delta) y pesadas
+def _separar(grafo, delta):
+    offsets, destinos, pesos = grafo.offsets, grafo.destinos, grafo.pesos
+    fila = np.repeat(np.arange(len(grafo)), np.diff(offsets))
+    aristas = {}
+    for tipo, mascara in (('ligeras', pesos <= delta), ('pesadas', pesos > delta)):
+        nuevos = np.zeros(len(grafo) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(fila[mascara], minlength=len(grafo)), out=nuevos[1:])
+        aristas[tipo] = (nuevos, destinos[mascara], pesos[mascara].astype(np.int64))
+    return aristas
+
+
+# Delta por defecto (Meyer-Sanders): peso máximo / grado medio, así cada
+# cubeta tiene pocas re-relajaciones ligeras sin pasar por muchas cubetas
+def delta_por_defecto(grafo):
+    if len(grafo.pesos) == 0:
+        return 1
+    grado_medio = len(grafo.destinos) / len(grafo)
+    return max(1, int(int(grafo.pesos.max()) / grado_medio))
+
+
+# Delta-stepping (Meyer-Sanders) sobre ids: los nodos se agrupan en
+# cubetas de ancho delta según su distancia; cada cubeta se vacía
+# relajando sus aristas ligeras en fases (todas las del frente a la vez,
+# con operaciones de NumPy) y al final las pesadas de todos sus nodos.
+# Con pesos no negativos da las mismas distancias que Dijkstra.
+# procesos > 1 reparte las relajaciones grandes entre procesos.
+# Devuelve (dist float64 con inf, prev int64 con -1, tiempos) donde
+# tiempos tiene los segundos y la cantidad de cada fase.
+def delta_stepping_ids(grafo, s, delta=None, procesos=1):
+    grafo = como_grafo(grafo)
+    if len(grafo.pesos) and int(grafo.pesos.min()) < 0:
+        raise ValueError("Delta-stepping necesita pesos no negativos")
+    if delta is None:
+        delta = delta_por_defecto(grafo)
+    if delta <= 0:
+        raise ValueError("delta debe ser positivo")
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+
+    tiempos = {'delta': delta, 'preparacion': 0.0, 'ligeras': 0.0, 'pesadas': 0.0,
+               'seleccion': 0.0, 'cubetas': 0, 'fases_ligeras': 0}
+    inicio = time.perf_counter()
+    n = len(grafo)
+    aristas = _separar(grafo, delta)
+    dist = np.full(n, _SIN_DISTANCIA, dtype=np.int64)
+    prev = np.full(n, -1, dtype=np.int64)
+    fijados = np.zeros(n, dtype=bool)
+    dist[s] = 0
+    # Nodos alcanzados y no fijados (la selección de cubeta solo mira estos,
+    # no los n nodos); en_espera evita repetirlos al agregar los mejorados
+    pendientes = np.array([s], dtype=np.int64)
+    en_espera = np.zeros(n, dtype=bool)
+    en_espera[s] = True
+    tiempos['preparacion'] = time.perf_counter() - inicio
+
+    pool = None
+    if procesos > 1:
+        pool = ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                   initargs=(aristas['ligeras'], aristas['pesadas']))
+    try:
+        while True:
+            # Cubeta siguiente: la de menor distancia entre los no fijados
+            t = time.perf_counter()
+            vivos = ~fijados[pendientes]
+            en_espera[pendientes[~vivos]] = False
+            pendientes = pendientes[vivos]
+            if not len(pendientes):
+                tiempos['seleccion'] += time.perf_counter() - t
+                break
+            distancias = dist[pendientes]
+            cubeta = int(distancias.min()) // delta
+            tope = (cubeta + 1) * delta
+            en_cubeta = distancias < tope
+            frente = pendientes[en_cubeta]
+            en_espera[frente] = False
+            pendientes = pendientes[~en_cubeta]
+            tiempos['seleccion'] += time.perf_counter() - t
+            tiempos['cubetas'] += 1
+
+            # Fases ligeras: lo que mejora y sigue en la cubeta vuelve al frente
+            t = time.perf_counter()
+            vaciados = []
+            while len(frente):
+                tiempos['fases_ligeras'] += 1
+                vaciados.append(frente)
+                fijados[frente] = True
+                mejorados = _relajar(aristas, 'ligeras', frente, dist, prev, pool, procesos)
+                en_cubeta = dist[mejorados] < tope
+                pendientes = _agregar(pendientes, en_espera, mejorados[~en_cubeta])
+                frente = mejorados[en_cubeta]
+                fijados[frente] = False
+            tiempos['ligeras'] += time.perf_counter() - t
+
+            # Las pesadas siempre caen en cubetas posteriores: una sola vez
+            t = time.perf_counter()
+            vaciados = np.unique(np.concatenate(vaciados))
+            mejorados = _relajar(aristas, 'pesadas', vaciados, dist, prev, pool, procesos)
+            pendientes = _agregar(pendientes, en_espera, mejorados)
+            tiempos['pesadas'] += time.perf_counter() - t
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    tiempos['total'] = time.perf_counter() - inicio
+    return np.where(dist < _SIN_DISTANCIA, dist.astype(np.float64), np.inf), prev, tiempos
+
+
+# Versión con nombres, como algoritmo_dijkstra: (distancias, anterior, tiempos)
+def algoritmo_delta_stepping(grafo, origen, delta=None, procesos=1):
+    if origen not in grafo:
+        print(f"Error: nodo '{origen}' no existe")
+        return {}, {}, {}
+
+    grafo = como_grafo(grafo)
+    nombres = grafo.nombres
+    dist, prev, tiempos = delta_stepping_ids(grafo, grafo.indices[origen], delta, procesos)
+
+    finitas = np.isfinite(dist)
+    valores = np.where(finitas, dist, 0).astype(np.int64).tolist()
+    distancias = {nombre: (d if f else float('inf'))
+                  for nombre, d, f in zip(nombres, valores, finitas.tolist())}
+    anterior = {nombres[v]: (nombres[p] if p >= 0 else None) for v, p in enumerate(prev.tolist())}
+    return distancias, anterior, tiempos
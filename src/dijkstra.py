@@ -1,63 +1,212 @@
 import csv
 import heapq
-import matplotlib.pyplot as plt
-import networkx as nx
-from matplotlib.patches import Patch
 
+import numpy as np
 
-# Lee el grafo desde un CSV
+try:
+    from .cache_grafo import cargar_grafo
+    from .grafo import como_grafo, resumen_carga
+    from .grafo import leer_grafo as _leer_grafo
+except ImportError:
+    from cache_grafo import cargar_grafo
+    from grafo import como_grafo, resumen_carga
+    from grafo import leer_grafo as _leer_grafo
+
+
+# Con peso máximo hasta este valor se usan las cubetas de Dial; con pesos
+# mayores el recorrido de cubetas vacías sale más caro y se usa el radix heap
+MAX_PESO_DIAL = 256
+
+# Distancia "infinita" entera para los motores de cubetas (al devolver se
+# cambia por inf, así el resultado es igual al del heap)
+_SIN_DISTANCIA = 1 << 62
+
+
+# Compatibilidad con la API anterior: {nodo: [(vecino, peso), ...]} como
+# diccionario. El Grafo CSR se obtiene con grafo.leer_grafo o cargar_grafo.
 def leer_grafo(ruta):
-    grafo = {}
-    with open(ruta, 'r', encoding='utf-8') as f:
-        lector = csv.DictReader(f)
-        for fila in lector:
-            origen = fila['origen'].strip()
-            destino = fila['destino'].strip()
-            peso = int(fila['peso'])
-            
-            if origen not in grafo:
-                grafo[origen] = []
-            if destino not in grafo:
-                grafo[destino] = []
-            
-            grafo[origen].append((destino, peso))
-            grafo[destino].append((origen, peso))
-    
-    return grafo
+    return dict(_leer_grafo(ruta).items())
 
 
-# Algoritmo de Dijkstra
-def algoritmo_dijkstra(grafo, origen):
-    if origen not in grafo:
-        print(f"Error: nodo '{origen}' no existe")
-        return {}, {}
+# Dijkstra con heap binario de tuplas (sirve para cualquier peso no negativo)
+def _dijkstra_heap(grafo, s):
+    offsets = grafo.offsets.tolist()
+    destinos = grafo.destinos
+    pesos = grafo.pesos
+    n = len(grafo)
     
     # Distancias infinitas al inicio
-    distancias = {nodo: float('inf') for nodo in grafo}
-    distancias[origen] = 0
+    dist = [float('inf')] * n
+    dist[s] = 0
     
-    # Para reconstruir rutas
-    anterior = {nodo: None for nodo in grafo}
+    # Para reconstruir rutas (-1 = sin predecesor)
+    prev = [-1] * n
     
-    visitados = set()
-    heap = [(0, origen)]
+    visitados = bytearray(n)
+    heap = [(0, s)]
     
     while heap:
         dist_actual, nodo_actual = heapq.heappop(heap)
         
-        if nodo_actual in visitados:
+        if visitados[nodo_actual]:
             continue
         
-        visitados.add(nodo_actual)
+        visitados[nodo_actual] = 1
         
-        for vecino, peso in grafo[nodo_actual]:
-            if vecino not in visitados:
+        a, b = offsets[nodo_actual], offsets[nodo_actual + 1]
+        for vecino, peso in zip(destinos[a:b].tolist(), pesos[a:b].tolist()):
+            if not visitados[vecino]:
                 nueva_dist = dist_actual + peso
-                if nueva_dist < distancias[vecino]:
-                    distancias[vecino] = nueva_dist
-                    anterior[vecino] = nodo_actual
+                if nueva_dist < dist[vecino]:
+                    dist[vecino] = nueva_dist
+                    prev[vecino] = nodo_actual
                     heapq.heappush(heap, (nueva_dist, vecino))
     
+    return dist, prev
+
+
+# Dial: una cubeta por distancia, en un arreglo circular de peso_max + 1
+# cubetas (todas las distancias pendientes caben en esa ventana). Los nodos
+# se guardan sin clave; una entrada vieja se reconoce porque dist ya bajó.
+def _dijkstra_dial(grafo, s, peso_max):
+    offsets = grafo.offsets.tolist()
+    destinos = grafo.destinos
+    pesos = grafo.pesos
+    n = len(grafo)
+    ancho = peso_max + 1
+    
+    dist = [_SIN_DISTANCIA] * n
+    dist[s] = 0
+    prev = [-1] * n
+    visitados = bytearray(n)
+    cubetas = [[] for _ in range(ancho)]
+    cubetas[0].append(s)
+    pendientes = 1
+    
+    d = 0
+    while pendientes:
+        cubeta = cubetas[d % ancho]
+        # Las aristas de peso 0 agregan a esta misma cubeta mientras se vacía
+        while cubeta:
+            nodo_actual = cubeta.pop()
+            pendientes -= 1
+            if visitados[nodo_actual] or dist[nodo_actual] != d:
+                continue
+            visitados[nodo_actual] = 1
+            
+            a, b = offsets[nodo_actual], offsets[nodo_actual + 1]
+            for vecino, peso in zip(destinos[a:b].tolist(), pesos[a:b].tolist()):
+                nueva_dist = d + peso
+                if nueva_dist < dist[vecino]:
+                    dist[vecino] = nueva_dist
+                    prev[vecino] = nodo_actual
+                    cubetas[nueva_dist % ancho].append(vecino)
+                    pendientes += 1
+        d += 1
+    
+    return _con_infinitos(dist), prev
+
+
+# Radix heap: la cubeta i tiene los nodos cuya distancia difiere de la
+# última extraída en el bit i-1 como más alto (cubeta 0 = misma distancia).
+# Cuando la cubeta 0 se vacía se reparte la primera no vacía tomando su
+# mínimo como nueva referencia; cada nodo baja de cubeta a lo sumo ~64 veces.
+def _dijkstra_radix(grafo, s):
+    offsets = grafo.offsets.tolist()
+    destinos = grafo.destinos
+    pesos = grafo.pesos
+    n = len(grafo)
+    
+    dist = [_SIN_DISTANCIA] * n
+    dist[s] = 0
+    prev = [-1] * n
+    visitados = bytearray(n)
+    cubetas = [[] for _ in range(65)]
+    cubetas[0].append(s)
+    ultima = 0
+    
+    while True:
+        if not cubetas[0]:
+            i = 1
+            while i < 65 and not cubetas[i]:
+                i += 1
+            if i == 65:
+                break
+            vivos = [v for v in cubetas[i] if not visitados[v]]
+            cubetas[i] = []
+            if not vivos:
+                continue
+            ultima = min([dist[v] for v in vivos])
+            for v in vivos:
+                cubetas[(dist[v] ^ ultima).bit_length()].append(v)
+            continue
+        
+        nodo_actual = cubetas[0].pop()
+        if visitados[nodo_actual]:
+            continue
+        visitados[nodo_actual] = 1
+        
+        d = ultima
+        a, b = offsets[nodo_actual], offsets[nodo_actual + 1]
+        for vecino, peso in zip(destinos[a:b].tolist(), pesos[a:b].tolist()):
+            nueva_dist = d + peso
+            if nueva_dist < dist[vecino]:
+                dist[vecino] = nueva_dist
+                prev[vecino] = nodo_actual
+                cubetas[(nueva_dist ^ d).bit_length()].append(vecino)
+    
+    return _con_infinitos(dist), prev
+
+
+def _con_infinitos(dist):
+    inf = float('inf')
+    return [d if d < _SIN_DISTANCIA else inf for d in dist]
+
+
+# Motor según el rango de pesos: 'dial' con pesos enteros chicos, 'radix'
+# con pesos grandes y 'heap' si hay pesos negativos (las colas de cubetas
+# suponen claves que nunca bajan de la última extraída)
+def elegir_motor(grafo):
+    if len(grafo.pesos) == 0:
+        return 'dial'
+    if int(grafo.pesos.min()) < 0:
+        return 'heap'
+    return 'dial' if int(grafo.pesos.max()) <= MAX_PESO_DIAL else 'radix'
+
+
+# Dijkstra sobre ids enteros: devuelve listas (dist, prev) indexadas por
+# id, con inf para los no alcanzables y -1 sin predecesor.
+# motor: 'auto' (según elegir_motor), 'dial', 'radix' o 'heap'. 'dial'
+# reserva una cubeta por unidad de peso, así que solo se acepta con peso
+# máximo hasta MAX_PESO_DIAL.
+def dijkstra_ids(grafo, s, motor='auto'):
+    if motor == 'auto':
+        motor = elegir_motor(grafo)
+    if motor == 'heap':
+        return _dijkstra_heap(grafo, s)
+    if motor == 'radix':
+        return _dijkstra_radix(grafo, s)
+    if motor == 'dial':
+        peso_max = int(grafo.pesos.max()) if len(grafo.pesos) else 0
+        if peso_max > MAX_PESO_DIAL:
+            raise ValueError(f"El motor 'dial' admite pesos hasta {MAX_PESO_DIAL} "
+                             f"(peso máximo del grafo: {peso_max}); use 'radix'")
+        return _dijkstra_dial(grafo, s, peso_max)
+    raise ValueError(f"Motor de Dijkstra desconocido: {motor}")
+
+
+# Algoritmo de Dijkstra sobre el grafo CSR (acepta también un diccionario)
+def algoritmo_dijkstra(grafo, origen, motor='auto'):
+    if origen not in grafo:
+        print(f"Error: nodo '{origen}' no existe")
+        return {}, {}
+    
+    grafo = como_grafo(grafo)
+    nombres = grafo.nombres
+    dist, prev = dijkstra_ids(grafo, grafo.indices[origen], motor)
+    
+    distancias = dict(zip(nombres, dist))
+    anterior = {nombres[v]: (nombres[p] if p >= 0 else None) for v, p in enumerate(prev)}
     return distancias, anterior
 
 
@@ -71,8 +220,173 @@ def reconstruir_ruta(anterior, destino):
     return ruta[::-1]
 
 
+# Todas las rutas del árbol de caminos más cortos en una sola pasada.
+# prev es la lista/arreglo de predecesores por id (-1 = sin predecesor).
+# Arma los hijos de cada nodo en formato CSR y recorre el árbol en
+# profundidad desde s guardando solo los nombres de la rama actual (uno
+# por nivel); el texto de cada ruta se arma al generarla. Genera
+# (id, ruta_texto) en preorden; los nodos no alcanzables no aparecen.
+def rutas_ids(prev, s, nombres, separador=' → '):
+    prev = np.asarray(prev, dtype=np.int64)
+    con_padre = np.flatnonzero(prev >= 0)
+    padres = prev[con_padre]
+    orden = np.argsort(padres, kind='stable')
+    hijos = con_padre[orden].tolist()
+    inicios = np.zeros(len(prev) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(padres, minlength=len(prev)), out=inicios[1:])
+    inicios = inicios.tolist()
+    
+    pila = [(s, 0)]
+    rama = []
+    while pila:
+        v, nivel = pila.pop()
+        del rama[nivel:]
+        rama.append(nombres[v])
+        yield v, separador.join(rama)
+        # Al revés para sacar primero el hijo de menor id
+        pila.extend((h, nivel + 1) for h in reversed(hijos[inicios[v]:inicios[v + 1]]))
+
+
+# Igual que rutas_ids pero con el resultado de algoritmo_dijkstra:
+# genera (nodo, ruta_texto) para cada nodo alcanzable
+def todas_las_rutas(grafo, anterior, origen, separador=' → '):
+    grafo = como_grafo(grafo)
+    nombres, indices = grafo.nombres, grafo.indices
+    prev = [-1 if anterior[nombre] is None else indices[anterior[nombre]] for nombre in nombres]
+    for v, texto in rutas_ids(prev, indices[origen], nombres, separador):
+        yield nombres[v], texto
+
+
+# Escribe un CSV destino,distancia,ruta con todas las rutas desde origen,
+# línea por línea mientras se recorre el árbol (los no alcanzables van al
+# final con distancia inf y ruta vacía). Si no se dan dist/prev por id se
+# calculan con dijkstra_ids. Devuelve la cantidad de filas escritas.
+def escribir_rutas(grafo, origen, ruta_salida, dist=None, prev=None, separador=' → '):
+    grafo = como_grafo(grafo)
+    s = grafo.indices[origen]
+    if dist is None or prev is None:
+        dist, prev = dijkstra_ids(grafo, s)
+    nombres = grafo.nombres
+    
+    filas = 0
+    with open(ruta_salida, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(['destino', 'distancia', 'ruta'])
+        for v, texto in rutas_ids(prev, s, nombres, separador):
+            escritor.writerow([nombres[v], dist[v], texto])
+            filas += 1
+        for v in np.flatnonzero(np.isinf(np.asarray(dist, dtype=np.float64))).tolist():
+            escritor.writerow([nombres[v], dist[v], ''])
+            filas += 1
+    return filas
+
+
+# Sigue los predecesores (dict id -> id, -1 en el extremo) desde un nodo
+def _camino_ids(prev, nodo):
+    camino = []
+    while nodo != -1:
+        camino.append(nodo)
+        nodo = prev[nodo]
+    return camino
+
+
+# Dijkstra de origen a destino que se detiene al fijar el destino. El estado
+# se guarda en diccionarios, así la consulta solo paga por lo que explora.
+def _ruta_unidireccional(grafo, s, t):
+    offsets, destinos, pesos = grafo.offsets, grafo.destinos, grafo.pesos
+    dist = {s: 0}
+    prev = {s: -1}
+    visitados = set()
+    heap = [(0, s)]
+    
+    while heap:
+        dist_actual, nodo_actual = heapq.heappop(heap)
+        if nodo_actual in visitados:
+            continue
+        if nodo_actual == t:
+            return dist_actual, _camino_ids(prev, t)[::-1]
+        visitados.add(nodo_actual)
+        
+        a, b = offsets[nodo_actual], offsets[nodo_actual + 1]
+        for vecino, peso in zip(destinos[a:b].tolist(), pesos[a:b].tolist()):
+            nueva_dist = dist_actual + peso
+            if nueva_dist < dist.get(vecino, float('inf')):
+                dist[vecino] = nueva_dist
+                prev[vecino] = nodo_actual
+                heapq.heappush(heap, (nueva_dist, vecino))
+    
+    return float('inf'), []
+
+
+# Dijkstra bidireccional: una búsqueda desde cada extremo, avanzando
+# siempre la de menor clave. Termina cuando la suma de los mínimos de
+# ambos heaps ya no puede mejorar el mejor camino encontrado.
+def _ruta_bidireccional(grafo, s, t):
+    offsets, destinos, pesos = grafo.offsets, grafo.destinos, grafo.pesos
+    if s == t:
+        return 0, [s]
+    
+    dist = ({s: 0}, {t: 0})
+    prev = ({s: -1}, {t: -1})
+    visitados = (set(), set())
+    heaps = ([(0, s)], [(0, t)])
+    mejor = float('inf')
+    encuentro = -1
+    
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= mejor:
+            break
+        lado = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        dist_actual, nodo_actual = heapq.heappop(heaps[lado])
+        if nodo_actual in visitados[lado]:
+            continue
+        visitados[lado].add(nodo_actual)
+        
+        dist_lado, dist_otro, prev_lado = dist[lado], dist[1 - lado], prev[lado]
+        a, b = offsets[nodo_actual], offsets[nodo_actual + 1]
+        for vecino, peso in zip(destinos[a:b].tolist(), pesos[a:b].tolist()):
+            nueva_dist = dist_actual + peso
+            if nueva_dist < dist_lado.get(vecino, float('inf')):
+                dist_lado[vecino] = nueva_dist
+                prev_lado[vecino] = nodo_actual
+                heapq.heappush(heaps[lado], (nueva_dist, vecino))
+            # ¿Se tocan las dos búsquedas?
+            otra = dist_otro.get(vecino)
+            if otra is not None and nueva_dist + otra < mejor:
+                mejor = nueva_dist + otra
+                encuentro = vecino
+    
+    if encuentro == -1:
+        return float('inf'), []
+    camino = _camino_ids(prev[0], encuentro)[::-1] + _camino_ids(prev[1], encuentro)[1:]
+    return mejor, camino
+
+
+# Camino más corto entre dos nodos: (distancia, ruta con nombres).
+# Si el destino no es alcanzable devuelve (inf, []).
+def ruta_mas_corta(grafo, origen, destino, bidireccional=True):
+    for nodo in (origen, destino):
+        if nodo not in grafo:
+            print(f"Error: nodo '{nodo}' no existe")
+            return float('inf'), []
+    
+    grafo = como_grafo(grafo)
+    s, t = grafo.indices[origen], grafo.indices[destino]
+    if bidireccional:
+        distancia, camino = _ruta_bidireccional(grafo, s, t)
+    else:
+        distancia, camino = _ruta_unidireccional(grafo, s, t)
+    nombres = grafo.nombres
+    return distancia, [nombres[v] for v in camino]
+
+
 # Crea imagen con los caminos más cortos
 def dibujar_caminos(grafo, origen, distancias, anterior, ruta="docs/evidencias/dijkstra_paths.png"):
+    # Importación diferida: solo se cargan al dibujar
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    from matplotlib.patches import Patch
+
     G = nx.Graph()
     
     # Agregar aristas
@@ -141,13 +455,15 @@ def dibujar_caminos(grafo, origen, distancias, anterior, ruta="docs/evidencias/d
 
 
 # Función principal
-def ejecutar_dijkstra(ruta_csv, nodo_origen=None, ruta_salida="docs/evidencias/dijkstra_paths.png"):
+def ejecutar_dijkstra(ruta_csv, nodo_origen=None, ruta_salida="docs/evidencias/dijkstra_paths.png",
+                      usar_cache=True, solo_calculo=False):
     print("=" * 60)
     print("ALGORITMO DE DIJKSTRA - Caminos más cortos")
     print("=" * 60)
     
     print(f"\nLeyendo: {ruta_csv}")
-    grafo = leer_grafo(ruta_csv)
+    grafo = cargar_grafo(ruta_csv, usar_cache)
+    print(resumen_carga(grafo))
     print(f"Nodos: {sorted(grafo.keys())}")
     
     # Pedir origen si no se dio
@@ -166,19 +482,23 @@ def ejecutar_dijkstra(ruta_csv, nodo_origen=None, ruta_salida="docs/evidencias/d
     print(f"{'Destino':<10} {'Distancia':<12} {'Ruta'}")
     print("-" * 50)
     
-    for nodo in sorted(grafo.keys()):
+    # Rutas en el orden del recorrido del árbol, impresas a medida que se
+    # generan (sin guardarlas todas); los no alcanzables van al final
+    for nodo, ruta in todas_las_rutas(grafo, anterior, nodo_origen):
         if nodo == nodo_origen:
             print(f"{nodo:<10} {0:<12} {nodo} (origen)")
-        elif distancias[nodo] == float('inf'):
-            print(f"{nodo:<10} {'∞':<12} No alcanzable")
         else:
-            ruta = reconstruir_ruta(anterior, nodo)
-            print(f"{nodo:<10} {distancias[nodo]:<12} {' → '.join(ruta)}")
+            print(f"{nodo:<10} {distancias[nodo]:<12} {ruta}")
+    for nodo in grafo.keys():
+        if distancias[nodo] == float('inf'):
+            print(f"{nodo:<10} {'∞':<12} No alcanzable")
     
     print("-" * 50)
     
-    print("\nGenerando imagen...")
-    dibujar_caminos(grafo, nodo_origen, distancias, anterior, ruta_salida)
+    # En modo solo cálculo no se importa matplotlib ni se genera la imagen
+    if not solo_calculo:
+        print("\nGenerando imagen...")
+        dibujar_caminos(grafo, nodo_origen, distancias, anterior, ruta_salida)
     
     print("\n¡Listo!")
     print("=" * 60)
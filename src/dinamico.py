@@ -0,0 +1,189 @@
+import heapq
+
+import numpy as np
+
+try:
+    from .grafo import Grafo
+except ImportError:
+    from grafo import Grafo
+
+
+# Aplica un lote de cambios al grafo (en sitio). Cada cambio es
+# (origen, destino, peso): fija el peso de todas las aristas entre ambos
+# nodos, o agrega una si no había; con peso None las borra. Si un par
+# aparece varias veces vale el último cambio.
+# Devuelve [(u, v, antes, despues)] por par con los pesos mínimos del par
+# antes y después (None = sin arista).
+def aplicar_cambios(grafo, cambios):
+    n = len(grafo)
+    indices = grafo.indices
+    por_par = {}
+    for origen, destino, peso in cambios:
+        for nodo in (origen, destino):
+            if nodo not in indices:
+                raise KeyError(f"nodo '{nodo}' no existe")
+        u, v = indices[origen], indices[destino]
+        por_par[(min(u, v), max(u, v))] = peso
+    if not por_par:
+        return []
+
+    origenes, destinos, pesos = grafo.aristas_ids()
+    claves = np.minimum(origenes, destinos).astype(np.int64) * n + np.maximum(origenes, destinos)
+    claves_cambio = np.array([u * n + v for u, v in por_par], dtype=np.int64)
+    tocadas = np.flatnonzero(np.isin(claves, claves_cambio))
+
+    # Aristas actuales de cada par cambiado
+    existentes = {}
+    for i, clave in zip(tocadas.tolist(), claves[tocadas].tolist()):
+        existentes.setdefault(divmod(clave, n), []).append(i)
+
+    nuevos_pesos = np.array(pesos, dtype=np.int64)
+    borrar = []
+    agregar = []
+    resultado = []
+    for (u, v), peso in por_par.items():
+        aristas = existentes.get((u, v), [])
+        antes = min(int(pesos[i]) for i in aristas) if aristas else None
+        if peso is None:
+            borrar.extend(aristas)
+        elif aristas:
+            nuevos_pesos[aristas] = peso
+        else:
+            agregar.append((u, v, peso))
+        if antes is not None or peso is not None:
+            resultado.append((u, v, antes, peso))
+
+    if borrar or agregar:
+        quedan = np.ones(len(nuevos_pesos), dtype=bool)
+        quedan[borrar] = False
+        extra = np.array(agregar, dtype=np.int64).reshape(-1, 3)
+        grafo.reemplazar_aristas(np.concatenate((origenes[quedan], extra[:, 0])),
+                                 np.concatenate((destinos[quedan], extra[:, 1])),
+                                 np.concatenate((nuevos_pesos[quedan], extra[:, 2])))
+    else:
+        # Solo cambian pesos: se corrigen en la adyacencia sin reordenarla
+        pesos_csr = np.array(grafo.pesos, dtype=np.int64)
+        for (u, v), peso in por_par.items():
+            if peso is None:
+                continue
+            for a, b in ((u, v), (v, u)):
+                inicio = grafo.offsets[a]
+                fila = grafo.destinos[inicio:grafo.offsets[a + 1]]
+                pesos_csr[inicio + np.flatnonzero(fila == b)] = peso
+        grafo.reemplazar_pesos(pesos_csr)
+    return resultado
+
+
+# Repara en sitio las listas (dist, prev) de dijkstra_ids después de
+# aplicar_cambios, al estilo Ramalingam-Reps: las aristas del árbol que
+# subieron o se borraron invalidan solo el subárbol que colgaba de ellas,
+# que se vuelve a sembrar desde sus vecinos no afectados; las aristas que
+# bajaron o se agregaron se relajan. Desde ahí se propaga como Dijkstra
+# tocando únicamente los nodos cuya distancia mejora.
+# Devuelve el conjunto de ids con distancia o predecesor cambiados.
+def reparar_ids(grafo, dist, prev, cambios):
+    inf = float('inf')
+    offsets, destinos, pesos = grafo.offsets, grafo.destinos, grafo.pesos
+
+    def vecinos(x):
+        a, b = offsets[x], offsets[x + 1]
+        return zip(destinos[a:b].tolist(), pesos[a:b].tolist())
+
+    raices = []
+    bajadas = []
+    for u, v, antes, despues in cambios:
+        if antes is not None and (despues is None or despues > antes):
+            if prev[v] == u:
+                raices.append(v)
+            elif prev[u] == v:
+                raices.append(u)
+        if despues is not None and (antes is None or despues < antes):
+            bajadas.append((u, v, despues))
+
+    # Subárbol afectado: los hijos de x en el árbol son vecinos con prev == x
+    afectados = set(raices)
+    pila = list(raices)
+    while pila:
+        x = pila.pop()
+        for y, _ in vecinos(x):
+            if prev[y] == x and y not in afectados:
+                afectados.add(y)
+                pila.append(y)
+
+    for x in afectados:
+        dist[x] = inf
+        prev[x] = -1
+
+    heap = []
+    cambiados = set(afectados)
+    for x in afectados:
+        for y, w in vecinos(x):
+            if y not in afectados and dist[y] + w < dist[x]:
+                dist[x] = dist[y] + w
+                prev[x] = y
+        if dist[x] < inf:
+            heap.append((dist[x], x))
+    for u, v, w in bajadas:
+        for a, b in ((u, v), (v, u)):
+            if dist[a] + w < dist[b]:
+                dist[b] = dist[a] + w
+                prev[b] = a
+                cambiados.add(b)
+                heap.append((dist[b], b))
+    heapq.heapify(heap)
+
+    while heap:
+        d, x = heapq.heappop(heap)
+        if d > dist[x]:
+            continue
+        for y, w in vecinos(x):
+            nueva_dist = d + w
+            if nueva_dist < dist[y]:
+                dist[y] = nueva_dist
+                prev[y] = x
+                cambiados.add(y)
+                heapq.heappush(heap, (nueva_dist, y))
+    return cambiados
+
+
+# Vista por id de un diccionario por nombre (distancias o anterior) para
+# que reparar_ids solo toque las entradas que lee o escribe. Guarda el
+# valor original de cada entrada modificada.
+class _VistaPorId:
+    def __init__(self, datos, grafo, a_id=None, a_nombre=None):
+        self.datos = datos
+        self.nombres = grafo.nombres
+        self.a_id = a_id or (lambda valor: valor)
+        self.a_nombre = a_nombre or (lambda valor: valor)
+        self.originales = {}
+
+    def __getitem__(self, x):
+        return self.a_id(self.datos[self.nombres[x]])
+
+    def __setitem__(self, x, valor):
+        nombre = self.nombres[x]
+        self.originales.setdefault(nombre, self.datos[nombre])
+        self.datos[nombre] = self.a_nombre(valor)
+
+
+# Versión con nombres para el resultado de algoritmo_dijkstra: aplica los
+# cambios al grafo (tiene que ser un Grafo, se modifica en sitio) y
+# actualiza distancias/anterior en sitio sin recalcular desde cero.
+# Devuelve los nodos cuya distancia o predecesor cambió.
+def actualizar_dijkstra(grafo, distancias, anterior, cambios):
+    if not isinstance(grafo, Grafo):
+        raise TypeError("actualizar_dijkstra necesita un Grafo (se modifica en sitio)")
+    cambios_ids = aplicar_cambios(grafo, cambios)
+
+    nombres = grafo.nombres
+    indices = grafo.indices
+    dist = _VistaPorId(distancias, grafo)
+    prev = _VistaPorId(anterior, grafo,
+                       a_id=lambda nombre: -1 if nombre is None else indices[nombre],
+                       a_nombre=lambda p: None if p < 0 else nombres[p])
+    reparar_ids(grafo, dist, prev, cambios_ids)
+
+    tocados = dist.originales.keys() | prev.originales.keys()
+    return [nombre for nombre in sorted(tocados, key=indices.get) if (
+        distancias[nombre] != dist.originales.get(nombre, distancias[nombre])
+        or anterior[nombre] != prev.originales.get(nombre, anterior[nombre]))]
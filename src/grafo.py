@@ -0,0 +1,495 @@
+import csv
+import hashlib
+import time
+from array import array
+from functools import cached_property
+
+import numpy as np
+
+
+# Tipo entero más chico (int32 o int64) que guarda todos los valores
+def _tipo_entero(valores):
+    if len(valores) == 0:
+        return np.int32
+    limites = np.iinfo(np.int32)
+    return np.int32 if limites.min <= int(valores.min()) and int(valores.max()) <= limites.max else np.int64
+
+
+# Grafo no dirigido compacto: nodos internados a enteros y adyacencia CSR
+# (offsets/destinos/pesos). Los vecinos del nodo u están en
+# destinos[offsets[u]:offsets[u+1]] con sus pesos en la misma posición.
+# Ids y pesos van en int32 cuando alcanza. La lista de aristas del CSV no
+# se guarda aparte: arista_csr[i] es la posición en la adyacencia de la
+# arista i en el sentido origen -> destino, y de ahí salen origen, destino
+# y peso (ver aristas_ids).
+class Grafo:
+    def __init__(self, nombres, origenes, destinos, pesos):
+        self.nombres = list(nombres)
+        self.estadisticas_carga = None
+        self._construir_csr(np.asarray(origenes, dtype=np.int32),
+                            np.asarray(destinos, dtype=np.int32), np.asarray(pesos))
+
+    # Crea el grafo con arreglos CSR ya calculados (por ejemplo, desde la cache)
+    @classmethod
+    def desde_arreglos(cls, nombres, offsets, destinos, pesos, arista_csr):
+        grafo = cls.__new__(cls)
+        grafo.nombres = nombres
+        grafo.offsets = offsets
+        grafo.destinos = destinos
+        grafo.pesos = pesos
+        grafo.arista_csr = arista_csr
+        grafo.estadisticas_carga = None
+        return grafo
+
+    # Nombre -> id; se construye al primer uso
+    @cached_property
+    def indices(self):
+        return {nombre: i for i, nombre in enumerate(self.nombres)}
+
+    # Huella del contenido (nombres y adyacencia) para validar índices
+    # guardados en disco contra el grafo con el que se usan
+    @cached_property
+    def huella(self):
+        h = hashlib.blake2b(digest_size=16)
+        h.update('\n'.join(self.nombres).encode('utf-8'))
+        for arreglo in (self.offsets, self.destinos, self.pesos):
+            arreglo = np.ascontiguousarray(arreglo)
+            h.update(arreglo.dtype.str.encode())
+            h.update(arreglo)
+        return h.hexdigest()
+
+    # Llamar después de modificar los arreglos en sitio para que la huella
+    # se recalcule y los resultados guardados del grafo anterior se descarten
+    def marcar_modificado(self):
+        self.__dict__.pop('huella', None)
+
+    # Cambia la lista de aristas (mismos nodos) y rehace la adyacencia
+    def reemplazar_aristas(self, origenes, destinos, pesos):
+        self._construir_csr(np.asarray(origenes, dtype=np.int32),
+                            np.asarray(destinos, dtype=np.int32), np.asarray(pesos))
+        self.marcar_modificado()
+
+    # Cambia los pesos de la adyacencia (mismo orden que self.pesos)
+    def reemplazar_pesos(self, pesos):
+        pesos = np.asarray(pesos)
+        self.pesos = pesos.astype(_tipo_entero(pesos))
+        self.marcar_modificado()
+
+    def _construir_csr(self, origenes, destinos, pesos):
+        n = len(self.nombres)
+        m = len(origenes)
+        tipo_posicion = np.int32 if 2 * m <= np.iinfo(np.int32).max else np.int64
+
+        # Intercalar ambos sentidos fila por fila para conservar el orden
+        # de vecinos que daba el diccionario de listas
+        fuentes = np.empty(2 * m, dtype=np.int32)
+        fuentes[0::2] = origenes
+        fuentes[1::2] = destinos
+        self.offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(fuentes, minlength=n), out=self.offsets[1:])
+        orden = np.argsort(fuentes, kind='stable').astype(tipo_posicion)
+        del fuentes
+
+        # En `orden` la posición par 2i es la arista i en su sentido original
+        # y la impar 2i+1 el sentido inverso
+        inversa = orden & 1
+        arista = orden >> 1
+        del orden
+        self.destinos = np.where(inversa, origenes[arista], destinos[arista])
+        self.pesos = pesos.astype(_tipo_entero(pesos), copy=False)[arista]
+        directas = np.flatnonzero(inversa == 0).astype(tipo_posicion)
+        self.arista_csr = np.empty(m, dtype=tipo_posicion)
+        self.arista_csr[arista[directas]] = directas
+
+    # Aristas del CSV como arreglos (origenes, destinos, pesos int64) en
+    # el orden original. Se arman en cada llamada: conviene pedirlos una vez.
+    def aristas_ids(self):
+        posiciones = self.arista_csr
+        fila = np.repeat(np.arange(len(self.nombres), dtype=np.int32), np.diff(self.offsets))
+        return (fila[posiciones], self.destinos[posiciones],
+                self.pesos[posiciones].astype(np.int64))
+
+    @property
+    def arista_origen(self):
+        return self.aristas_ids()[0]
+
+    @property
+    def arista_destino(self):
+        return self.destinos[self.arista_csr]
+
+    @property
+    def arista_peso(self):
+        return self.pesos[self.arista_csr].astype(np.int64)
+
+    @property
+    def num_aristas(self):
+        return len(self.arista_csr)
+
+    # Vecinos del nodo con id u como arreglos (ids, pesos)
+    def vecinos_ids(self, u):
+        a, b = self.offsets[u], self.offsets[u + 1]
+        return self.destinos[a:b], self.pesos[a:b]
+
+    # Interfaz tipo diccionario {nodo: [(vecino, peso), ...]} para el
+    # código que todavía trabaja con nombres (dibujos, impresión)
+    def __len__(self):
+        return len(self.nombres)
+
+    def __iter__(self):
+        return iter(self.nombres)
+
+    def __contains__(self, nodo):
+        return nodo in self.indices
+
+    def __getitem__(self, nodo):
+        ids, pesos = self.vecinos_ids(self.indices[nodo])
+        nombres = self.nombres
+        return [(nombres[v], p) for v, p in zip(ids.tolist(), pesos.tolist())]
+
+    def keys(self):
+        return list(self.nombres)
+
+    def items(self):
+        for nodo in self.nombres:
+            yield nodo, self[nodo]
+
+    # Aristas originales con nombres: (origen, destino, peso)
+    def aristas(self):
+        nombres = self.nombres
+        for u, v, p in zip(*(a.tolist() for a in self.aristas_ids())):
+            yield nombres[u], nombres[v], p
+
+    def __repr__(self):
+        return f"Grafo(nodos={len(self)}, aristas={self.num_aristas})"
+
+
+# Tamaño de bloque para leer el CSV (bytes)
+TAM_BLOQUE = 1 << 24
+
+
+# Construye el Grafo por bloques: interna etiquetas en lote y acumula
+# arreglos de ids, así la lectura nunca guarda más de un bloque de texto
+class ConstructorGrafo:
+    def __init__(self):
+        self.indices = {}
+        self.nombres = []
+        self.filas = 0
+        self._origenes = []
+        self._destinos = []
+        self._pesos = []
+
+    # Convierte un arreglo de etiquetas a ids, asignando ids nuevos en
+    # orden de primera aparición (igual que la lectura fila por fila)
+    def internar(self, etiquetas):
+        etiquetas = np.asarray(etiquetas)
+        if etiquetas.dtype.kind == 'S' and etiquetas.dtype.itemsize <= 8:
+            # Etiquetas cortas: ordenar como enteros de 64 bits es mucho más
+            # rápido que comparar cadenas
+            claves = etiquetas.astype('S8').view(np.uint64)
+            unicas, primera, inversa = np.unique(claves, return_index=True, return_inverse=True)
+            unicas = unicas.view('S8')
+        else:
+            unicas, primera, inversa = np.unique(etiquetas, return_index=True, return_inverse=True)
+        valores = unicas.tolist()
+        ids = np.empty(len(valores), dtype=np.int32)
+        indices = self.indices
+        nombres = self.nombres
+        for j in np.argsort(primera, kind='stable').tolist():
+            nombre = valores[j]
+            if isinstance(nombre, bytes):
+                nombre = nombre.decode('utf-8')
+            i = indices.get(nombre)
+            if i is None:
+                i = indices[nombre] = len(nombres)
+                nombres.append(nombre)
+            ids[j] = i
+        return ids[inversa.ravel()]
+
+    def agregar_bloque(self, origenes, destinos, pesos):
+        if len(pesos) == 0:
+            return
+        # Intercalar por fila para respetar el orden de aparición
+        ids = self.internar(np.column_stack((origenes, destinos)).ravel()).reshape(-1, 2)
+        self._origenes.append(ids[:, 0].copy())
+        self._destinos.append(ids[:, 1].copy())
+        self._pesos.append(np.asarray(pesos, dtype=np.int64))
+        self.filas += len(pesos)
+
+    def construir(self):
+        if self._pesos:
+            # Se suelta cada lista de bloques apenas se une, para no tener
+            # todas las copias a la vez
+            origenes = np.concatenate(self._origenes)
+            self._origenes = []
+            destinos = np.concatenate(self._destinos)
+            self._destinos = []
+            pesos = np.concatenate(self._pesos)
+            self._pesos = []
+        else:
+            origenes = destinos = np.empty(0, dtype=np.int32)
+            pesos = np.empty(0, dtype=np.int64)
+        return Grafo(self.nombres, origenes, destinos, pesos)
+
+
+# Bytes que quita bytes.strip()
+_ESPACIOS = np.zeros(256, dtype=bool)
+_ESPACIOS[list(b' \t\n\r\x0b\x0c')] = True
+# Dígitos de más no caben en int64 al convertir con NumPy
+MAX_DIGITOS = 18
+
+
+# Límites de los campos de un bloque (sin '\r') como dos tablas filas x
+# columnas (inicio y fin de cada campo), o None si alguna línea no tiene
+# exactamente num_columnas campos: los separadores tienen que repetir el
+# patrón num_columnas - 1 comas y un salto de línea.
+def _limites_campos(bytes_bloque, num_columnas):
+    es_separador = bytes_bloque == ord(',')
+    es_separador |= bytes_bloque == ord('\n')
+    # Posiciones en int32 si caben aun sumando el margen de _parsear_numpy
+    tipo = _tipo_entero(np.array([3 * len(bytes_bloque) + 2]))
+    separadores = np.flatnonzero(es_separador).astype(tipo)
+    del es_separador
+    total = len(separadores) + 1
+    if total % num_columnas:
+        return None
+    es_fin = np.empty(total, dtype=bool)
+    np.equal(bytes_bloque[separadores], ord('\n'), out=es_fin[:-1])
+    es_fin[-1] = True
+    es_fin = es_fin.reshape(-1, num_columnas)
+    if es_fin[:, :-1].any() or not es_fin[:, -1].all():
+        return None
+    inicios = np.empty(total, dtype=separadores.dtype)
+    inicios[0] = 0
+    np.add(separadores, 1, out=inicios[1:])
+    fines = np.append(separadores, len(bytes_bloque))
+    return inicios.reshape(-1, num_columnas), fines.reshape(-1, num_columnas)
+
+
+# Saca los espacios de los extremos de cada campo moviendo sus límites
+def _recortar(relleno, inicios, fines):
+    while True:
+        mover = (inicios < fines) & _ESPACIOS[relleno[inicios]]
+        if not mover.any():
+            break
+        inicios += mover
+    while True:
+        mover = (inicios < fines) & _ESPACIOS[relleno[fines - 1]]
+        if not mover.any():
+            break
+        fines -= mover
+
+
+# Copia los bytes de cada campo a una fila de `ancho` bytes alineados a la
+# izquierda (o a la derecha); lo que no es del campo queda en `relleno_byte`
+def _ventanas(relleno, inicios, fines, ancho, derecha=False, relleno_byte=0):
+    ventanas = np.lib.stride_tricks.sliding_window_view(relleno, ancho)
+    largos = (fines - inicios)[:, None]
+    if derecha:
+        filas = ventanas[fines - ancho]
+        fuera = np.arange(ancho) < ancho - largos
+    else:
+        filas = ventanas[inicios]
+        fuera = np.arange(ancho) >= largos
+    filas[fuera] = relleno_byte
+    return filas
+
+
+# Etiquetas de un campo como arreglo de bytes de ancho fijo
+def _columna_texto(relleno, inicios, fines):
+    _recortar(relleno, inicios, fines)
+    ancho = max(1, int((fines - inicios).max()))
+    return _ventanas(relleno, inicios, fines, ancho).view(f'S{ancho}').ravel()
+
+
+# Enteros de un campo (signo opcional y dígitos), o None si alguno no
+# tiene esa forma o no cabe en MAX_DIGITOS
+def _columna_entera(relleno, inicios, fines):
+    _recortar(relleno, inicios, fines)
+    primero = relleno[inicios]
+    negativos = primero == ord('-')
+    inicios += negativos | (primero == ord('+'))
+    largos = fines - inicios
+    if largos.min() < 1 or largos.max() > MAX_DIGITOS:
+        return None
+    ancho = int(largos.max())
+    digitos = _ventanas(relleno, inicios, fines, ancho, derecha=True, relleno_byte=ord('0'))
+    digitos -= ord('0')
+    if (digitos > 9).any():
+        return None
+    # Columna por columna para no crear una tabla de int64 del tamaño de
+    # los dígitos
+    valores = np.zeros(len(digitos), dtype=np.int64)
+    for j in range(ancho):
+        valores *= 10
+        valores += digitos[:, j]
+    np.negative(valores, out=valores, where=negativos)
+    return valores
+
+
+# Columnas (origen, destino, peso) sacadas directo de los bytes del bloque
+# con NumPy, sin crear un objeto de Python por campo. None si el bloque no
+# tiene la forma simple (se usa entonces la división por comas).
+def _parsear_numpy(datos, columnas, num_columnas):
+    bytes_bloque = np.frombuffer(datos, dtype=np.uint8)
+    limites = _limites_campos(bytes_bloque, num_columnas)
+    if limites is None:
+        return None
+    inicios, fines = limites
+    # Margen a ambos lados para que las ventanas nunca salgan del bloque
+    margen = int((fines - inicios).max()) + 1
+    relleno = np.zeros(len(bytes_bloque) + 2 * margen, dtype=np.uint8)
+    relleno[margen:margen + len(bytes_bloque)] = bytes_bloque
+    # Cada columna se copia ya desplazada; las tablas completas se sueltan
+    limites = [(inicios[:, i] + margen, fines[:, i] + margen) for i in columnas]
+    del inicios, fines
+    (ini_origen, fin_origen), (ini_destino, fin_destino), (ini_peso, fin_peso) = limites
+    pesos = _columna_entera(relleno, ini_peso, fin_peso)
+    if pesos is None:
+        return None
+    return (_columna_texto(relleno, ini_origen, fin_origen),
+            _columna_texto(relleno, ini_destino, fin_destino), pesos)
+
+
+# Separa un bloque de líneas completas en columnas (origen, destino, peso)
+def _parsear_bloque(datos, columnas, num_columnas):
+    i_origen, i_destino, i_peso = columnas
+
+    # Campos entre comillas: usar el lector csv del estándar
+    if b'"' in datos:
+        filas = [f for f in csv.reader(datos.decode('utf-8').splitlines()) if f]
+        for f in filas:
+            if len(f) != num_columnas:
+                raise ValueError(f"Línea con {len(f)} campos en vez de {num_columnas}: "
+                                 f"{','.join(f)[:80]!r}")
+        tabla = np.array([[f[i_origen], f[i_destino], f[i_peso]] for f in filas],
+                         dtype=str).reshape(-1, 3)
+        return (np.char.strip(tabla[:, 0]), np.char.strip(tabla[:, 1]),
+                tabla[:, 2].astype(np.int64))
+
+    if b'\r' in datos:
+        datos = datos.replace(b'\r', b'')
+    columnas_numpy = _parsear_numpy(datos, columnas, num_columnas)
+    if columnas_numpy is not None:
+        return columnas_numpy
+    if _limites_campos(np.frombuffer(datos, dtype=np.uint8), num_columnas) is not None:
+        # Pesos con otra forma (por ejemplo inválidos): los convierte NumPy
+        # desde el texto y da el mismo error que siempre
+        campos = datos.replace(b'\n', b',').split(b',')
+    else:
+        # Hay líneas vacías (se saltan) o con otra cantidad de campos
+        campos = []
+        for linea in datos.split(b'\n'):
+            if not linea.strip():
+                continue
+            fila = linea.split(b',')
+            if len(fila) != num_columnas:
+                raise ValueError(f"Línea con {len(fila)} campos en vez de {num_columnas}: "
+                                 f"{linea[:80].decode('utf-8', 'replace')!r}")
+            campos.extend(fila)
+
+    tabla = np.array(campos, dtype=bytes).reshape(-1, num_columnas)
+    return (np.char.strip(tabla[:, i_origen]), np.char.strip(tabla[:, i_destino]),
+            tabla[:, i_peso].astype(np.int64))
+
+
+# Lee el grafo desde un CSV (origen,destino,peso) por bloques grandes.
+# Las estadísticas de lectura quedan en grafo.estadisticas_carga.
+def leer_grafo(ruta, tam_bloque=TAM_BLOQUE, mostrar_progreso=False):
+    inicio = time.perf_counter()
+    constructor = ConstructorGrafo()
+
+    with open(ruta, 'rb') as f:
+        encabezado = f.readline().decode('utf-8-sig').strip()
+        nombres_columnas = [c.strip() for c in next(csv.reader([encabezado]))]
+        columnas = tuple(nombres_columnas.index(c) for c in ('origen', 'destino', 'peso'))
+
+        resto = b''
+        while True:
+            bloque = f.read(tam_bloque)
+            if not bloque:
+                break
+            bloque = resto + bloque
+            corte = bloque.rfind(b'\n')
+            if corte < 0:
+                resto = bloque
+                continue
+            resto = bloque[corte + 1:]
+            datos = bloque[:corte]
+            del bloque
+            if datos.strip():
+                constructor.agregar_bloque(*_parsear_bloque(datos, columnas, len(nombres_columnas)))
+            if mostrar_progreso:
+                transcurrido = time.perf_counter() - inicio
+                print(f"  {constructor.filas} filas ({constructor.filas / transcurrido:.0f} filas/s)")
+
+        if resto.strip():
+            constructor.agregar_bloque(*_parsear_bloque(resto, columnas, len(nombres_columnas)))
+
+    grafo = constructor.construir()
+    segundos = time.perf_counter() - inicio
+    grafo.estadisticas_carga = {
+        'filas': constructor.filas,
+        'segundos': segundos,
+        'filas_por_segundo': constructor.filas / segundos if segundos > 0 else float('inf'),
+    }
+    return grafo
+
+
+# Texto corto con el rendimiento de la última lectura
+def resumen_carga(grafo):
+    est = grafo.estadisticas_carga
+    if not est:
+        return f"Nodos: {len(grafo)}, aristas: {grafo.num_aristas}"
+    origen = " desde cache" if est.get('cache') else ""
+    return (f"Filas: {est['filas']} en {est['segundos']:.3f} s{origen} "
+            f"({est['filas_por_segundo']:.0f} filas/s)")
+
+
+# Convierte un diccionario {nodo: [(vecino, peso), ...]} a Grafo.
+# Cada arista no dirigida aparece una vez en cada sentido; al agregarla se
+# anota la entrada de vuelta pendiente para no duplicarla.
+def grafo_desde_dict(grafo):
+    indices = {nodo: i for i, nodo in enumerate(grafo)}
+    pendientes = {}
+    origenes = array('i')
+    destinos = array('i')
+    pesos = array('q')
+    for nodo, vecinos in grafo.items():
+        u = indices[nodo]
+        for vecino, peso in vecinos:
+            v = indices[vecino]
+            clave = (u, v, peso)
+            if pendientes.get(clave):
+                pendientes[clave] -= 1
+                continue
+            vuelta = (v, u, peso)
+            pendientes[vuelta] = pendientes.get(vuelta, 0) + 1
+            origenes.append(u)
+            destinos.append(v)
+            pesos.append(peso)
+    return Grafo(list(grafo), origenes, destinos, pesos)
+
+
+# Acepta un Grafo o un diccionario de adyacencia y devuelve un Grafo
+def como_grafo(grafo):
+    if isinstance(grafo, Grafo):
+        return grafo
+    return grafo_desde_dict(grafo)
+
+
+# Construye un Grafo a partir de nodos y aristas con nombres (origen, destino, peso)
+def grafo_desde_aristas(nodos, aristas):
+    nombres = list(nodos)
+    indices = {nodo: i for i, nodo in enumerate(nombres)}
+    origenes = array('i')
+    destinos = array('i')
+    pesos = array('q')
+    for origen, destino, peso in aristas:
+        for nodo in (origen, destino):
+            if nodo not in indices:
+                indices[nodo] = len(nombres)
+                nombres.append(nodo)
+        origenes.append(indices[origen])
+        destinos.append(indices[destino])
+        pesos.append(peso)
+    return Grafo(nombres, origenes, destinos, pesos)
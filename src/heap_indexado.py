@@ -0,0 +1,101 @@
+from array import array
+
+
+# Heap d-ario indexado por id de nodo (0..n-1) con disminución de clave.
+# Cada nodo aparece a lo sumo una vez, así el heap nunca pasa de n entradas.
+class HeapIndexado:
+    def __init__(self, n, aridad=4):
+        self.aridad = aridad
+        self.nodos = []
+        self.claves = []
+        self.posicion = array('i', [-1]) * n
+
+    def __len__(self):
+        return len(self.nodos)
+
+    def __bool__(self):
+        return bool(self.nodos)
+
+    def __contains__(self, nodo):
+        return self.posicion[nodo] >= 0
+
+    def clave(self, nodo):
+        i = self.posicion[nodo]
+        return self.claves[i] if i >= 0 else None
+
+    # Inserta el nodo o disminuye su clave. Devuelve True si cambió algo.
+    def actualizar(self, nodo, clave):
+        i = self.posicion[nodo]
+        if i < 0:
+            i = len(self.nodos)
+            self.nodos.append(nodo)
+            self.claves.append(clave)
+            self.posicion[nodo] = i
+        elif clave < self.claves[i]:
+            self.claves[i] = clave
+        else:
+            return False
+        self._subir(i)
+        return True
+
+    # Saca el nodo de menor clave: (nodo, clave)
+    def extraer_min(self):
+        nodos = self.nodos
+        claves = self.claves
+        nodo, clave = nodos[0], claves[0]
+        self.posicion[nodo] = -1
+
+        ultimo_nodo = nodos.pop()
+        ultima_clave = claves.pop()
+        if nodos:
+            nodos[0] = ultimo_nodo
+            claves[0] = ultima_clave
+            self.posicion[ultimo_nodo] = 0
+            self._bajar(0)
+        return nodo, clave
+
+    def _subir(self, i):
+        nodos = self.nodos
+        claves = self.claves
+        posicion = self.posicion
+        aridad = self.aridad
+        nodo, clave = nodos[i], claves[i]
+        while i > 0:
+            padre = (i - 1) // aridad
+            if claves[padre] <= clave:
+                break
+            nodos[i] = nodos[padre]
+            claves[i] = claves[padre]
+            posicion[nodos[i]] = i
+            i = padre
+        nodos[i] = nodo
+        claves[i] = clave
+        posicion[nodo] = i
+
+    def _bajar(self, i):
+        nodos = self.nodos
+        claves = self.claves
+        posicion = self.posicion
+        aridad = self.aridad
+        n = len(nodos)
+        nodo, clave = nodos[i], claves[i]
+        while True:
+            primero = aridad * i + 1
+            if primero >= n:
+                break
+            # Hijo de menor clave
+            menor = primero
+            menor_clave = claves[primero]
+            for hijo in range(primero + 1, min(primero + aridad, n)):
+                if claves[hijo] < menor_clave:
+                    menor = hijo
+                    menor_clave = claves[hijo]
+            if menor_clave >= clave:
+                break
+            nodos[i] = nodos[menor]
+            claves[i] = menor_clave
+            posicion[nodos[i]] = i
+            i = menor
+        nodos[i] = nodo
+        claves[i] = clave
+        posicion[nodo] = i
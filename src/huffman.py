@@ -1,7 +1,5 @@
 import heapq
 from collections import Counter
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 import numpy as np
 
 
@@ -103,6 +101,10 @@ def arbol_a_texto(nodo, prefijo="", es_izq=True):
 
 # Crea imagen del árbol
 def dibujar_arbol(raiz, ruta="docs/evidencias/huffman_tree.png"):
+    # Importación diferida: solo se cargan al dibujar
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
+
     if raiz is None:
         print("Árbol vacío")
         return
@@ -173,6 +175,8 @@ def dibujar_arbol(raiz, ruta="docs/evidencias/huffman_tree.png"):
 
 # Crea gráfica de frecuencias
 def dibujar_frecuencias(frecuencias, ruta="docs/evidencias/huffman_freq.png"):
+    import matplotlib.pyplot as plt
+
     if not frecuencias:
         print("No hay datos")
         return
@@ -216,7 +220,7 @@ def dibujar_frecuencias(frecuencias, ruta="docs/evidencias/huffman_freq.png"):
 
 # Función principal
 def ejecutar_huffman(ruta_txt, ruta_arbol="docs/evidencias/huffman_tree.png", 
-                     ruta_freq="docs/evidencias/huffman_freq.png"):
+                     ruta_freq="docs/evidencias/huffman_freq.png", solo_calculo=False):
     
     print("=" * 60)
     print("ALGORITMO DE HUFFMAN")
@@ -276,10 +280,11 @@ def ejecutar_huffman(ruta_txt, ruta_arbol="docs/evidencias/huffman_tree.png",
     print("-" * 40)
     print(arbol_a_texto(raiz))
     
-    # Generar imágenes
-    print("Generando imágenes...")
-    dibujar_arbol(raiz, ruta_arbol)
-    dibujar_frecuencias(frecuencias, ruta_freq)
+    # Generar imágenes (se omiten en modo solo cálculo)
+    if not solo_calculo:
+        print("Generando imágenes...")
+        dibujar_arbol(raiz, ruta_arbol)
+        dibujar_frecuencias(frecuencias, ruta_freq)
     
     # Ejemplo
     print("\n" + "-" * 40)
@@ -1,6 +1,22 @@
-import csv
-import matplotlib.pyplot as plt
-import networkx as nx
+from array import array
+
+import numpy as np
+
+try:
+    from .cache_grafo import cargar_grafo
+    from .grafo import grafo_desde_aristas, resumen_carga
+    from .grafo import leer_grafo as _leer_grafo
+except ImportError:
+    from cache_grafo import cargar_grafo
+    from grafo import grafo_desde_aristas, resumen_carga
+    from grafo import leer_grafo as _leer_grafo
+
+
+# Compatibilidad con la API anterior: (nodos, aristas) con nombres. El
+# Grafo CSR se obtiene con grafo.leer_grafo o cargar_grafo.
+def leer_grafo(ruta):
+    grafo = _leer_grafo(ruta)
+    return set(grafo.nombres), list(grafo.aristas())
 
 
 # Estructura para detectar ciclos
@@ -14,10 +30,13 @@ class UnionFind:
             self.padre[x] = x
             self.rango[x] = 0
     
+    # Iterativo con compresión por mitades (sin límite de recursión)
     def encontrar(self, x):
-        if self.padre[x] != x:
-            self.padre[x] = self.encontrar(self.padre[x])
-        return self.padre[x]
+        padre = self.padre
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
     
     def unir(self, x, y):
         px, py = self.encontrar(x), self.encontrar(y)
@@ -31,23 +50,75 @@ class UnionFind:
         return True
 
 
-# Lee el grafo desde un CSV
-def leer_grafo(ruta):
-    nodos = set()
-    aristas = []
+# Union-Find sobre ids enteros 0..n-1 guardado en arreglos compactos:
+# compresión por mitades iterativa y unión por tamaño
+class UnionFindArreglo:
+    def __init__(self, n):
+        self.padre = array('i', range(n))
+        self.tamano = array('i', [1]) * n
+        self.componentes = n
+    
+    def encontrar(self, x):
+        padre = self.padre
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
     
-    with open(ruta, 'r', encoding='utf-8') as f:
-        lector = csv.DictReader(f)
-        for fila in lector:
-            origen = fila['origen'].strip()
-            destino = fila['destino'].strip()
-            peso = int(fila['peso'])
-            
-            nodos.add(origen)
-            nodos.add(destino)
-            aristas.append((origen, destino, peso))
+    def unir(self, x, y):
+        px, py = self.encontrar(x), self.encontrar(y)
+        if px == py:
+            return False
+        tamano = self.tamano
+        if tamano[px] < tamano[py]:
+            px, py = py, px
+        self.padre[py] = px
+        tamano[px] += tamano[py]
+        self.componentes -= 1
+        return True
     
-    return nodos, aristas
+    # Une las aristas (origenes[i], destinos[i]) en orden y devuelve una
+    # máscara con las que unieron dos componentes. Se detiene tras `limite`
+    # uniones (por ejemplo n-1 en Kruskal); el resto queda en False.
+    def unir_lote(self, origenes, destinos, limite=None):
+        padre = self.padre
+        tamano = self.tamano
+        unidas = np.zeros(len(origenes), dtype=bool)
+        restantes = self.componentes - 1 if limite is None else limite
+        if restantes <= 0:
+            return unidas
+        
+        for i, (x, y) in enumerate(zip(np.asarray(origenes).tolist(), np.asarray(destinos).tolist())):
+            while padre[x] != x:
+                padre[x] = padre[padre[x]]
+                x = padre[x]
+            while padre[y] != y:
+                padre[y] = padre[padre[y]]
+                y = padre[y]
+            if x == y:
+                continue
+            if tamano[x] < tamano[y]:
+                x, y = y, x
+            padre[y] = x
+            tamano[x] += tamano[y]
+            self.componentes -= 1
+            unidas[i] = True
+            restantes -= 1
+            if restantes == 0:
+                break
+        
+        return unidas
+    
+    # Raíces de un arreglo de nodos sin modificar la estructura: salta de
+    # padre en padre sobre todo el arreglo a la vez hasta que no cambie
+    def raices(self, nodos):
+        padre = np.frombuffer(self.padre, dtype=np.intc)
+        r = padre[nodos]
+        while True:
+            siguiente = padre[r]
+            if np.array_equal(siguiente, r):
+                return r
+            r = siguiente
 
 
 # Convierte aristas a grafo de adyacencia
@@ -63,36 +134,94 @@ def aristas_a_grafo(aristas):
     return grafo
 
 
-# Algoritmo de Kruskal
-def algoritmo_kruskal(nodos, aristas):
-    if not nodos or not aristas:
-        return [], 0
+# Bajo este número de aristas Filter-Kruskal ordena directamente
+UMBRAL_FILTRO = 1 << 15
+
+
+# Kruskal clásico sobre un subconjunto de aristas (índices en orden original).
+# aristas = (origenes, destinos, pesos) de grafo.aristas_ids().
+def _kruskal_ordenado(aristas, indices, uf, elegidas):
+    origenes, destinos, pesos = aristas
+    orden = indices[np.argsort(pesos[indices], kind='stable')]
+    unidas = uf.unir_lote(origenes[orden], destinos[orden])
+    elegidas.append(orden[unidas])
+
+
+# Filter-Kruskal: parte las aristas en ligeras (peso <= pivote) y pesadas,
+# resuelve las ligeras y descarta de las pesadas las que ya cierran ciclo
+# antes de ordenarlas. Los empates nunca quedan en lados distintos, así que
+# el resultado es idéntico al de ordenar todo.
+def _kruskal_filtrado(aristas, indices, uf, elegidas):
+    if len(indices) <= UMBRAL_FILTRO:
+        _kruskal_ordenado(aristas, indices, uf, elegidas)
+        return
     
-    # Ordenar aristas por peso
-    aristas_ordenadas = sorted(aristas, key=lambda x: x[2])
+    origenes, destinos, pesos = aristas
+    pesos = pesos[indices]
+    mitad = len(pesos) // 2
+    pivote = np.partition(pesos, mitad)[mitad]
+    ligeras = pesos <= pivote
+    if ligeras.all():
+        _kruskal_ordenado(aristas, indices, uf, elegidas)
+        return
     
-    uf = UnionFind()
-    for nodo in nodos:
-        uf.agregar(nodo)
+    _kruskal_filtrado(aristas, indices[ligeras], uf, elegidas)
+    if uf.componentes == 1:
+        return
     
-    mst = []
-    peso_total = 0
+    pesadas = indices[~ligeras]
+    cruzan = uf.raices(origenes[pesadas]) != uf.raices(destinos[pesadas])
+    _kruskal_filtrado(aristas, pesadas[cruzan], uf, elegidas)
+
+
+# Algoritmo de Kruskal. Acepta un Grafo (algoritmo_kruskal(grafo)) o el
+# par clásico de nodos y lista de aristas con nombres.
+# modo: 'ordenar' (argsort de todas las aristas), 'filtrar' (Filter-Kruskal)
+# o 'auto' (filtrar en grafos densos).
+def algoritmo_kruskal(nodos, aristas=None, modo='auto'):
+    if aristas is not None:
+        if not nodos or not aristas:
+            return [], 0
+        grafo = grafo_desde_aristas(nodos, aristas)
+    else:
+        grafo = nodos
     
-    for origen, destino, peso in aristas_ordenadas:
-        # Si no forma ciclo, agregar al MST
-        if uf.unir(origen, destino):
-            mst.append((origen, destino, peso))
-            peso_total += peso
-            
-         
-            if len(mst) == len(nodos) - 1:
-                break
+    if len(grafo) == 0 or grafo.num_aristas == 0:
+        return [], 0
     
-    return mst, peso_total
+    n = len(grafo)
+    m = grafo.num_aristas
+    if modo == 'auto':
+        modo = 'filtrar' if m > UMBRAL_FILTRO and m >= 4 * n else 'ordenar'
+    if modo not in ('ordenar', 'filtrar'):
+        raise ValueError(f"Modo de Kruskal desconocido: {modo}")
+    
+    # Una arista entra al MST si no forma ciclo; se para en n-1 aristas
+    uf = UnionFindArreglo(n)
+    elegidas = []
+    todas = np.arange(m)
+    aristas = grafo.aristas_ids()
+    if modo == 'filtrar':
+        _kruskal_filtrado(aristas, todas, uf, elegidas)
+    else:
+        _kruskal_ordenado(aristas, todas, uf, elegidas)
+    elegidas = np.concatenate(elegidas)
+    
+    nombres = grafo.nombres
+    origenes, destinos, pesos = aristas
+    pesos = pesos[elegidas].tolist()
+    mst = [(nombres[u], nombres[v], p) for u, v, p in zip(
+        origenes[elegidas].tolist(), destinos[elegidas].tolist(), pesos)]
+    
+    return mst, sum(pesos)
 
 
 # Crea imagen del MST
 def dibujar_mst(grafo, mst, ruta="docs/evidencias/kruskal_mst.png"):
+    # Importación diferida: solo se cargan al dibujar
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
     G = nx.Graph()
     
     # Agregar aristas
@@ -135,18 +264,20 @@ def dibujar_mst(grafo, mst, ruta="docs/evidencias/kruskal_mst.png"):
 
 
 # Función principal
-def ejecutar_kruskal(ruta_csv, ruta_salida="docs/evidencias/kruskal_mst.png"):
+def ejecutar_kruskal(ruta_csv, ruta_salida="docs/evidencias/kruskal_mst.png", usar_cache=True,
+                     solo_calculo=False):
     print("=" * 60)
     print("ALGORITMO DE KRUSKAL - MST")
     print("=" * 60)
     
     print(f"\nLeyendo: {ruta_csv}")
-    nodos, aristas = leer_grafo(ruta_csv)
-    print(f"Nodos: {sorted(nodos)}")
-    print(f"Aristas: {len(aristas)}")
+    grafo = cargar_grafo(ruta_csv, usar_cache)
+    print(resumen_carga(grafo))
+    print(f"Nodos: {sorted(grafo.keys())}")
+    print(f"Aristas: {grafo.num_aristas}")
     
     print("\nEjecutando Kruskal...")
-    mst, peso_total = algoritmo_kruskal(nodos, aristas)
+    mst, peso_total = algoritmo_kruskal(grafo)
     
     print("\n" + "-" * 40)
     print("ARISTAS DEL MST (orden de selección):")
@@ -156,9 +287,10 @@ def ejecutar_kruskal(ruta_csv, ruta_salida="docs/evidencias/kruskal_mst.png"):
     print("-" * 40)
     print(f"PESO TOTAL: {peso_total}")
     
-    print("\nGenerando imagen...")
-    grafo = aristas_a_grafo(aristas)
-    dibujar_mst(grafo, mst, ruta_salida)
+    # En modo solo cálculo no se importa matplotlib ni se genera la imagen
+    if not solo_calculo:
+        print("\nGenerando imagen...")
+        dibujar_mst(grafo, mst, ruta_salida)
     
     print("\n¡Listo!")
     print("=" * 60)
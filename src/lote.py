@@ -0,0 +1,147 @@
+import io
+import json
+import time
+
+import numpy as np
+
+try:
+    from .boruvka import algoritmo_boruvka
+    from .cache_grafo import cargar_grafo
+    from .dijkstra import algoritmo_dijkstra, ruta_mas_corta
+    from .huffman import calcular_frecuencias, construir_arbol, generar_codigos, leer_texto
+    from .kruskal import algoritmo_kruskal
+    from .prim import algoritmo_prim
+except ImportError:
+    from boruvka import algoritmo_boruvka
+    from cache_grafo import cargar_grafo
+    from dijkstra import algoritmo_dijkstra, ruta_mas_corta
+    from huffman import calcular_frecuencias, construir_arbol, generar_codigos, leer_texto
+    from kruskal import algoritmo_kruskal
+    from prim import algoritmo_prim
+
+
+# Resultados como diccionarios listos para JSON (sin imprimir nada)
+
+def resultado_prim(grafo, inicio=None, modo='auto'):
+    mst, peso_total = algoritmo_prim(grafo, inicio, modo)
+    return {'nodos': len(grafo), 'aristas': grafo.num_aristas,
+            'mst': [list(a) for a in mst], 'peso_total': peso_total}
+
+
+def resultado_kruskal(grafo, modo='auto'):
+    mst, peso_total = algoritmo_kruskal(grafo, modo=modo)
+    return {'nodos': len(grafo), 'aristas': grafo.num_aristas,
+            'mst': [list(a) for a in mst], 'peso_total': peso_total}
+
+
+def resultado_boruvka(grafo):
+    mst, peso_total = algoritmo_boruvka(grafo)
+    return {'nodos': len(grafo), 'aristas': grafo.num_aristas,
+            'mst': [list(a) for a in mst], 'peso_total': peso_total}
+
+
+def resultado_dijkstra(grafo, origen):
+    if origen not in grafo:
+        raise KeyError(f"nodo '{origen}' no existe")
+    distancias, anterior = algoritmo_dijkstra(grafo, origen)
+    # JSON no admite infinito: los no alcanzables quedan en null
+    return {'nodos': len(grafo), 'aristas': grafo.num_aristas, 'origen': origen,
+            'distancias': {n: (None if d == float('inf') else d) for n, d in distancias.items()},
+            'anterior': anterior}
+
+
+def resultado_ruta(grafo, origen, destino):
+    for nodo in (origen, destino):
+        if nodo not in grafo:
+            raise KeyError(f"nodo '{nodo}' no existe")
+    distancia, ruta = ruta_mas_corta(grafo, origen, destino)
+    return {'nodos': len(grafo), 'aristas': grafo.num_aristas, 'origen': origen,
+            'destino': destino, 'distancia': None if distancia == float('inf') else distancia,
+            'ruta': ruta}
+
+
+def resultado_huffman(texto):
+    frecuencias = calcular_frecuencias(texto)
+    codigos = generar_codigos(construir_arbol(frecuencias))
+    bits_huffman = sum(frecuencias[c] * len(codigo) for c, codigo in codigos.items())
+    return {'caracteres': len(texto), 'frecuencias': frecuencias, 'codigos': codigos,
+            'bits_original': len(texto) * 8, 'bits_huffman': bits_huffman}
+
+
+# Ejecuta un algoritmo sobre un archivo. Los errores no detienen el lote:
+# quedan registrados en el resultado con la clave 'error'.
+def procesar(algoritmo, ruta, origen=None, usar_cache=True, modo='auto', destino=None):
+    inicio = time.perf_counter()
+    resultado = {'algoritmo': algoritmo, 'archivo': ruta}
+    try:
+        if algoritmo == 'huffman':
+            resultado.update(resultado_huffman(leer_texto(ruta)))
+        else:
+            grafo = cargar_grafo(ruta, usar_cache)
+            if algoritmo == 'prim':
+                resultado.update(resultado_prim(grafo, origen, modo))
+            elif algoritmo == 'kruskal':
+                resultado.update(resultado_kruskal(grafo, modo))
+            elif algoritmo == 'boruvka':
+                resultado.update(resultado_boruvka(grafo))
+            elif algoritmo == 'dijkstra' and destino is not None:
+                resultado.update(resultado_ruta(grafo, origen, destino))
+            elif algoritmo == 'dijkstra':
+                resultado.update(resultado_dijkstra(grafo, origen))
+            else:
+                raise ValueError(f"Algoritmo desconocido: {algoritmo}")
+    except Exception as e:
+        resultado['error'] = f"{type(e).__name__}: {e}"
+    resultado['segundos'] = time.perf_counter() - inicio
+    return resultado
+
+
+# Una línea JSON por resultado
+def escribir_json(resultados, salida):
+    for resultado in resultados:
+        salida.write(json.dumps(resultado, ensure_ascii=False))
+        salida.write('\n')
+        salida.flush()
+
+
+# Convierte un resultado a arreglos NumPy con prefijo "<i>_"
+def _a_arreglos(i, resultado):
+    prefijo = f"{i}_"
+    arreglos = {prefijo + 'archivo': np.array(resultado['archivo'])}
+    if 'error' in resultado:
+        arreglos[prefijo + 'error'] = np.array(resultado['error'])
+    elif 'mst' in resultado:
+        mst = resultado['mst']
+        arreglos[prefijo + 'mst_origen'] = np.array([a[0] for a in mst], dtype=str)
+        arreglos[prefijo + 'mst_destino'] = np.array([a[1] for a in mst], dtype=str)
+        arreglos[prefijo + 'mst_peso'] = np.array([a[2] for a in mst], dtype=np.int64)
+        arreglos[prefijo + 'peso_total'] = np.array(resultado['peso_total'])
+    elif 'ruta' in resultado:
+        arreglos[prefijo + 'ruta'] = np.array(resultado['ruta'], dtype=str)
+        arreglos[prefijo + 'distancia'] = np.array(
+            np.inf if resultado['distancia'] is None else resultado['distancia'])
+    elif 'distancias' in resultado:
+        nodos = list(resultado['distancias'])
+        indice = {n: j for j, n in enumerate(nodos)}
+        arreglos[prefijo + 'nodos'] = np.array(nodos, dtype=str)
+        arreglos[prefijo + 'distancias'] = np.array(
+            [np.inf if d is None else d for d in resultado['distancias'].values()], dtype=np.float64)
+        arreglos[prefijo + 'anterior'] = np.array(
+            [-1 if p is None else indice[p] for p in resultado['anterior'].values()], dtype=np.int64)
+    elif 'codigos' in resultado:
+        simbolos = list(resultado['codigos'])
+        arreglos[prefijo + 'simbolos'] = np.array(simbolos, dtype=str)
+        arreglos[prefijo + 'frecuencias'] = np.array(
+            [resultado['frecuencias'][s] for s in simbolos], dtype=np.int64)
+        arreglos[prefijo + 'codigos'] = np.array([resultado['codigos'][s] for s in simbolos], dtype=str)
+    return arreglos
+
+
+# Todos los resultados en un solo archivo .npz (binario)
+def escribir_npz(resultados, salida):
+    arreglos = {}
+    for i, resultado in enumerate(resultados):
+        arreglos.update(_a_arreglos(i, resultado))
+    buffer = io.BytesIO()
+    np.savez(buffer, **arreglos)
+    salida.write(buffer.getvalue())
@@ -0,0 +1,80 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from .dijkstra import dijkstra_ids
+    from .grafo import como_grafo
+except ImportError:
+    from dijkstra import dijkstra_ids
+    from grafo import como_grafo
+
+
+# Tareas por proceso, para que un origen lento no deje procesos ociosos
+TAREAS_POR_PROCESO = 4
+
+# Grafo de cada proceso trabajador (se recibe una vez al iniciar el pool;
+# con fork se hereda sin copiarlo y solo se lee)
+_grafo_trabajador = None
+
+
+def _iniciar_trabajador(grafo):
+    global _grafo_trabajador
+    _grafo_trabajador = grafo
+
+
+# Calcula las filas indicadas y las escribe directamente en los memmap,
+# así los resultados no vuelven por el pool
+def _calcular_filas(filas, fuentes, ruta_distancias, ruta_predecesores, grafo=None):
+    grafo = grafo if grafo is not None else _grafo_trabajador
+    distancias = np.load(ruta_distancias, mmap_mode='r+')
+    predecesores = np.load(ruta_predecesores, mmap_mode='r+') if ruta_predecesores else None
+    for fila, s in zip(filas, fuentes):
+        dist, prev = dijkstra_ids(grafo, s)
+        distancias[fila] = dist
+        if predecesores is not None:
+            predecesores[fila] = prev
+    distancias.flush()
+    if predecesores is not None:
+        predecesores.flush()
+    return len(filas)
+
+
+# Dijkstra desde varios orígenes a la vez. Escribe una matriz de distancias
+# (float64, inf = no alcanzable) en ruta_distancias y, si se pide, una de
+# predecesores (int32, -1 = sin predecesor) en ruta_predecesores, ambas como
+# .npy. La fila i corresponde a origenes[i] y las columnas siguen el orden
+# de grafo.nombres. Los orígenes se reparten en un pool de procesos.
+# Devuelve las matrices abiertas con mmap en solo lectura.
+def calcular_matriz_distancias(grafo, origenes, ruta_distancias, ruta_predecesores=None, procesos=None):
+    grafo = como_grafo(grafo)
+    for nodo in origenes:
+        if nodo not in grafo:
+            raise KeyError(f"nodo '{nodo}' no existe")
+    fuentes = [grafo.indices[nodo] for nodo in origenes]
+    forma = (len(fuentes), len(grafo))
+
+    np.lib.format.open_memmap(ruta_distancias, mode='w+', dtype=np.float64, shape=forma).flush()
+    if ruta_predecesores:
+        np.lib.format.open_memmap(ruta_predecesores, mode='w+', dtype=np.int32, shape=forma).flush()
+
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    procesos = max(1, min(procesos, len(fuentes)))
+
+    if procesos == 1:
+        _calcular_filas(range(len(fuentes)), fuentes, ruta_distancias, ruta_predecesores, grafo)
+    else:
+        tareas = np.array_split(np.arange(len(fuentes)), procesos * TAREAS_POR_PROCESO)
+        tareas = [t.tolist() for t in tareas if len(t)]
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                 initargs=(grafo,)) as pool:
+            trabajos = [pool.submit(_calcular_filas, filas, [fuentes[i] for i in filas],
+                                    ruta_distancias, ruta_predecesores) for filas in tareas]
+            for trabajo in trabajos:
+                trabajo.result()
+
+    distancias = np.load(ruta_distancias, mmap_mode='r')
+    predecesores = np.load(ruta_predecesores, mmap_mode='r') if ruta_predecesores else None
+    return distancias, predecesores
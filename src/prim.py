@@ -1,67 +1,200 @@
-import csv
 import heapq
-import matplotlib.pyplot as plt
-import networkx as nx
 
+import numpy as np
 
-# Lee el grafo desde un CSV
+try:
+    from .cache_grafo import cargar_grafo
+    from .grafo import como_grafo, resumen_carga
+    from .grafo import leer_grafo as _leer_grafo
+    from .heap_indexado import HeapIndexado
+except ImportError:
+    from cache_grafo import cargar_grafo
+    from grafo import como_grafo, resumen_carga
+    from grafo import leer_grafo as _leer_grafo
+    from heap_indexado import HeapIndexado
+
+
+# Densidad (aristas / pares posibles) desde la que conviene la matriz
+DENSIDAD_MATRIZ = 0.25
+# Tamaño máximo de la matriz de adyacencia (n x n en float64)
+MAX_NODOS_MATRIZ = 4096
+
+
+# Compatibilidad con la API anterior: {nodo: [(vecino, peso), ...]} como
+# diccionario. El Grafo CSR se obtiene con grafo.leer_grafo o cargar_grafo.
 def leer_grafo(ruta):
-    grafo = {}
-    with open(ruta, 'r', encoding='utf-8') as f:
-        lector = csv.DictReader(f)
-        for fila in lector:
-            origen = fila['origen'].strip()
-            destino = fila['destino'].strip()
-            peso = int(fila['peso'])
-            
-            if origen not in grafo:
-                grafo[origen] = []
-            if destino not in grafo:
-                grafo[destino] = []
-            
-            # Grafo no dirigido
-            grafo[origen].append((destino, peso))
-            grafo[destino].append((origen, peso))
-    
-    return grafo
-
-
-# Algoritmo de Prim
-def algoritmo_prim(grafo, inicio=None):
-    if not grafo:
-        return [], 0
-    
-    if inicio is None:
-        inicio = next(iter(grafo))
+    return dict(_leer_grafo(ruta).items())
+
+
+# Prim con heapq y entradas perezosas (una por arista incidente)
+def _prim_heap(grafo, s):
+    nombres = grafo.nombres
+    offsets = grafo.offsets.tolist()
+    destinos = grafo.destinos
+    pesos = grafo.pesos
+    n = len(nombres)
     
-    visitados = set()
+    visitados = bytearray(n)
+    cantidad = 0
     mst = []
     peso_total = 0
     
-    # Cola:
-    heap = [(0, inicio, inicio)]
+    # Cola: (peso, origen, destino) con ids enteros
+    heap = [(0, s, s)]
     
-    while heap and len(visitados) < len(grafo):
+    while heap and cantidad < n:
         peso, origen, actual = heapq.heappop(heap)
         
-        if actual in visitados:
+        if visitados[actual]:
             continue
         
-        visitados.add(actual)
+        visitados[actual] = 1
+        cantidad += 1
         
         if origen != actual:
-            mst.append((origen, actual, peso))
+            mst.append((nombres[origen], nombres[actual], peso))
             peso_total += peso
         
-        for vecino, peso_arista in grafo[actual]:
-            if vecino not in visitados:
+        a, b = offsets[actual], offsets[actual + 1]
+        for vecino, peso_arista in zip(destinos[a:b].tolist(), pesos[a:b].tolist()):
+            if not visitados[vecino]:
                 heapq.heappush(heap, (peso_arista, actual, vecino))
     
     return mst, peso_total
 
 
+# Prim con heap indexado: cada nodo está a lo sumo una vez en el heap y
+# se le disminuye la clave cuando aparece una arista más barata
+def _prim_indexado(grafo, s):
+    nombres = grafo.nombres
+    offsets = grafo.offsets.tolist()
+    destinos = grafo.destinos
+    pesos = grafo.pesos
+    n = len(nombres)
+    
+    visitados = bytearray(n)
+    padre = [-1] * n
+    heap = HeapIndexado(n)
+    heap.actualizar(s, 0)
+    mst = []
+    peso_total = 0
+    
+    while heap:
+        actual, peso = heap.extraer_min()
+        visitados[actual] = 1
+        
+        if padre[actual] >= 0:
+            mst.append((nombres[padre[actual]], nombres[actual], peso))
+            peso_total += peso
+        
+        a, b = offsets[actual], offsets[actual + 1]
+        for vecino, peso_arista in zip(destinos[a:b].tolist(), pesos[a:b].tolist()):
+            if not visitados[vecino] and heap.actualizar(vecino, peso_arista):
+                padre[vecino] = actual
+    
+    return mst, peso_total
+
+
+# Matriz de adyacencia n x n con el menor peso entre cada par (inf si no hay arista)
+def matriz_adyacencia(grafo):
+    n = len(grafo)
+    matriz = np.full((n, n), np.inf)
+    o, d, peso = grafo.aristas_ids()
+    o = o.astype(np.int64)
+    d = d.astype(np.int64)
+    
+    # Posición plana de cada arista en ambos sentidos; con aristas
+    # paralelas se queda el mínimo de cada grupo de posiciones iguales
+    celdas = np.concatenate((o * n + d, d * n + o))
+    pesos = np.concatenate((peso, peso))
+    orden = np.argsort(celdas)
+    celdas = celdas[orden]
+    if len(celdas):
+        inicios = np.flatnonzero(np.r_[True, celdas[1:] != celdas[:-1]])
+        matriz.flat[celdas[inicios]] = np.minimum.reduceat(pesos[orden], inicios)
+    
+    # Los lazos no sirven para el árbol
+    np.fill_diagonal(matriz, np.inf)
+    return matriz
+
+
+# Prim O(V²) vectorizado sobre la matriz de adyacencia: en cada paso se
+# elige el nodo más cercano con argmin y se actualizan las claves con una
+# sola operación sobre la fila del nodo
+def _prim_denso(grafo, s, matriz=None):
+    if matriz is None:
+        matriz = matriz_adyacencia(grafo)
+    nombres = grafo.nombres
+    n = len(nombres)
+    
+    clave = np.full(n, np.inf)
+    padre = np.full(n, -1, dtype=np.int64)
+    fuera = np.ones(n, dtype=bool)
+    # Claves de los nodos aún fuera del árbol (inf para los de dentro)
+    candidatos = np.full(n, np.inf)
+    candidatos[s] = 0
+    mst = []
+    peso_total = 0
+    
+    for _ in range(n):
+        actual = int(np.argmin(candidatos))
+        if candidatos[actual] == np.inf:
+            break
+        fuera[actual] = False
+        candidatos[actual] = np.inf
+        
+        if padre[actual] >= 0:
+            peso = int(clave[actual])
+            mst.append((nombres[padre[actual]], nombres[actual], peso))
+            peso_total += peso
+        
+        fila = matriz[actual]
+        mejora = fuera & (fila < clave)
+        clave[mejora] = fila[mejora]
+        candidatos[mejora] = fila[mejora]
+        padre[mejora] = actual
+    
+    return mst, peso_total
+
+
+# Elige la variante según la densidad del grafo
+def elegir_modo_prim(grafo):
+    n = len(grafo)
+    if n < 2:
+        return 'heap'
+    densidad = 2 * grafo.num_aristas / (n * (n - 1))
+    if densidad >= DENSIDAD_MATRIZ and n <= MAX_NODOS_MATRIZ:
+        return 'denso'
+    return 'indexado'
+
+
+# Algoritmo de Prim sobre el grafo CSR (acepta también un diccionario).
+# modo: 'heap' (heapq perezoso), 'indexado' (heap con disminución de clave),
+# 'denso' (O(V²) con matriz) o 'auto' (según la densidad).
+def algoritmo_prim(grafo, inicio=None, modo='auto'):
+    if not grafo:
+        return [], 0
+    
+    grafo = como_grafo(grafo)
+    s = 0 if inicio is None else grafo.indices[inicio]
+    
+    if modo == 'auto':
+        modo = elegir_modo_prim(grafo)
+    if modo == 'heap':
+        return _prim_heap(grafo, s)
+    if modo == 'indexado':
+        return _prim_indexado(grafo, s)
+    if modo == 'denso':
+        return _prim_denso(grafo, s)
+    raise ValueError(f"Modo de Prim desconocido: {modo}")
+
+
 # Crea imagen del MST
 def dibujar_mst(grafo, mst, ruta="docs/evidencias/prim_mst.png"):
+    # Importación diferida: solo se cargan al dibujar
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
     G = nx.Graph()
     
     # Agregar aristas
@@ -104,13 +237,15 @@ def dibujar_mst(grafo, mst, ruta="docs/evidencias/prim_mst.png"):
 
 
 # Función principal
-def ejecutar_prim(ruta_csv, ruta_salida="docs/evidencias/prim_mst.png"):
+def ejecutar_prim(ruta_csv, ruta_salida="docs/evidencias/prim_mst.png", usar_cache=True,
+                  solo_calculo=False):
     print("=" * 60)
     print("ALGORITMO DE PRIM - MST")
     print("=" * 60)
     
     print(f"\nLeyendo: {ruta_csv}")
-    grafo = leer_grafo(ruta_csv)
+    grafo = cargar_grafo(ruta_csv, usar_cache)
+    print(resumen_carga(grafo))
     print(f"Nodos: {sorted(grafo.keys())}")
     
     print("\nEjecutando Prim...")
@@ -124,8 +259,10 @@ def ejecutar_prim(ruta_csv, ruta_salida="docs/evidencias/prim_mst.png"):
     print("-" * 40)
     print(f"PESO TOTAL: {peso_total}")
     
-    print("\nGenerando imagen...")
-    dibujar_mst(grafo, mst, ruta_salida)
+    # En modo solo cálculo no se importa matplotlib ni se genera la imagen
+    if not solo_calculo:
+        print("\nGenerando imagen...")
+        dibujar_mst(grafo, mst, ruta_salida)
     
     print("\n¡Listo!")
     print("=" * 60)
@@ -0,0 +1,411 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    from .cache_grafo import cargar_grafo
+    from .cache_rutas import CacheArboles
+    from .lote import (resultado_dijkstra, resultado_huffman, resultado_kruskal,
+                       resultado_prim, resultado_ruta)
+except ImportError:
+    from cache_grafo import cargar_grafo
+    from cache_rutas import CacheArboles
+    from lote import (resultado_dijkstra, resultado_huffman, resultado_kruskal,
+                      resultado_prim, resultado_ruta)
+
+
+# Espera máxima para juntar solicitudes en un lote (segundos)
+VENTANA_LOTE = 0.002
+# Solicitudes por lote; al llegar a este número se despacha sin esperar
+MAX_LOTE = 64
+# Rutas desde un mismo origen en un lote a partir de las cuales conviene
+# calcular (y guardar) su árbol completo en vez de búsquedas bidireccionales
+RUTAS_POR_ARBOL = 32
+# Directorio del que POST /grafos puede cargar CSV (las rutas de la
+# solicitud son relativas a él)
+DIRECTORIO_DATOS = 'data/grafos'
+# Latencias guardadas por endpoint para calcular percentiles
+MUESTRAS_LATENCIA = 10000
+
+# Errores que vienen de la solicitud (responden 400 en vez de 500)
+_ERRORES_CLIENTE = ('KeyError', 'ValueError', 'TypeError')
+
+# Endpoints con métricas propias; las rutas desconocidas se cuentan juntas
+# bajo "404" (si no, cada ruta distinta agregaría una entrada)
+_ENDPOINTS = {'GET /salud', 'GET /grafos', 'POST /grafos', 'POST /dijkstra',
+              'POST /prim', 'POST /kruskal', 'POST /huffman'}
+
+
+# ---------------------------------------------------------------------------
+# Lado del trabajador: cada proceso carga los grafos al primer uso (con la
+# cache binaria la carga es un mmap) y los conserva entre solicitudes
+# mientras el CSV no cambie
+
+_grafos_trabajador = {}
+_arboles_trabajador = CacheArboles()
+
+
+# Grafo de `ruta` para este trabajador. Si cambiaron el tamaño o la fecha
+# del CSV se reemplaza por el actual (cargar_grafo valida la cache con la
+# clave completa); recargar=True lo vuelve a pedir siempre a cargar_grafo.
+def _grafo(ruta, recargar=False):
+    estado = os.stat(ruta)
+    firma = (estado.st_size, estado.st_mtime_ns)
+    guardado = _grafos_trabajador.get(ruta)
+    if recargar or guardado is None or guardado[0] != firma:
+        _grafos_trabajador.pop(ruta, None)
+        guardado = _grafos_trabajador[ruta] = (firma, cargar_grafo(ruta))
+    return guardado[1]
+
+
+# Ctrl+C llega a todo el grupo de procesos: lo atiende solo el servidor,
+# que cierra el pool ordenadamente
+def _iniciar_trabajador():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _precargar(ruta):
+    grafo = _grafo(ruta, recargar=True)
+    return {'nodos': len(grafo), 'aristas': grafo.num_aristas}
+
+
+def _resolver(operacion, ruta, parametros, rutas_por_origen):
+    if operacion == 'huffman':
+        texto = parametros['texto']
+        resultado = resultado_huffman(texto)
+        codigos = resultado['codigos']
+        resultado['codificado'] = ''.join(codigos[c] for c in texto)
+        return resultado
+
+    grafo = _grafo(ruta)
+    if operacion == 'dijkstra':
+        origen, destino = parametros['origen'], parametros.get('destino')
+        if destino is None:
+            return resultado_dijkstra(grafo, origen)
+        # Muchas rutas desde el mismo origen: un solo árbol para todas
+        if origen not in grafo:
+            raise KeyError(f"nodo '{origen}' no existe")
+        if (rutas_por_origen[origen] >= RUTAS_POR_ARBOL
+                or _arboles_trabajador.contiene(grafo, origen)):
+            distancia, ruta_nodos = _arboles_trabajador.ruta(grafo, origen, destino)
+            return {'nodos': len(grafo), 'aristas': grafo.num_aristas, 'origen': origen,
+                    'destino': destino,
+                    'distancia': None if distancia == float('inf') else distancia,
+                    'ruta': ruta_nodos}
+        return resultado_ruta(grafo, origen, destino)
+    if operacion == 'prim':
+        return resultado_prim(grafo, parametros.get('inicio'), parametros.get('modo', 'auto'))
+    if operacion == 'kruskal':
+        return resultado_kruskal(grafo, parametros.get('modo', 'auto'))
+    raise ValueError(f"Operación desconocida: {operacion}")
+
+
+# Resuelve un lote de solicitudes de la misma operación y grafo. Las
+# solicitudes iguales se calculan una vez. Devuelve por solicitud
+# (None, resultado) o (tipo_error, mensaje).
+def _resolver_lote(operacion, ruta, lista):
+    rutas_por_origen = defaultdict(int)
+    for parametros in lista:
+        if parametros.get('destino') is not None:
+            rutas_por_origen[parametros.get('origen')] += 1
+
+    hechos = {}
+    respuestas = []
+    for parametros in lista:
+        clave = json.dumps(parametros, sort_keys=True)
+        if clave not in hechos:
+            try:
+                hechos[clave] = (None, _resolver(operacion, ruta, parametros, rutas_por_origen))
+            except Exception as e:
+                hechos[clave] = (type(e).__name__, f"{type(e).__name__}: {e}")
+        respuestas.append(hechos[clave])
+    return respuestas
+
+
+# ---------------------------------------------------------------------------
+# Lado del servidor
+
+# Reparte un lote en hasta `partes` sublotes para trabajadores distintos
+# sin separar el trabajo compartido: las solicitudes iguales y las rutas
+# desde un mismo origen (que pueden usar un solo árbol) van juntas. Los
+# grupos más grandes se asignan primero, cada uno al sublote más liviano.
+# Devuelve listas de posiciones en el lote.
+def _repartir(lista, partes):
+    grupos = defaultdict(list)
+    for i, parametros in enumerate(lista):
+        if parametros.get('destino') is not None:
+            clave = json.dumps(['origen', parametros.get('origen')])
+        else:
+            clave = json.dumps(parametros, sort_keys=True)
+        grupos[clave].append(i)
+    sublotes = [[] for _ in range(max(1, min(partes, len(grupos))))]
+    for grupo in sorted(grupos.values(), key=len, reverse=True):
+        min(sublotes, key=len).extend(grupo)
+    return sublotes
+
+
+class ErrorSolicitud(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# Servicio HTTP local (TCP en localhost o socket Unix) que mantiene grafos
+# con nombre y atiende Dijkstra, Prim, Kruskal y Huffman. El cálculo corre
+# en un pool de procesos (procesos=0 usa un hilo, útil para pruebas); las
+# solicitudes de la misma operación y grafo que llegan juntas forman un
+# lote, que se reparte entre los trabajadores (ver _repartir).
+#
+#   GET  /salud                   {"ok": true}
+#   GET  /grafos                  grafos cargados
+#   POST /grafos                  {"nombre": "...", "ruta": "x.csv"} (dentro de `datos`)
+#   POST /dijkstra                {"grafo": "...", "origen": "A", "destino": "B"?}
+#   POST /prim                    {"grafo": "...", "inicio": "A"?, "modo": "auto"?}
+#   POST /kruskal                 {"grafo": "...", "modo": "auto"?}
+#   POST /huffman                 {"texto": "..."}
+#   GET  /metricas                latencias por endpoint y tamaño de lotes
+class Servidor:
+    def __init__(self, procesos=None, ventana=VENTANA_LOTE, max_lote=MAX_LOTE,
+                 datos=DIRECTORIO_DATOS):
+        if procesos is None:
+            procesos = os.cpu_count() or 1
+        self.procesos = procesos
+        self.datos = os.path.realpath(datos)
+        self.ventana = ventana
+        self.max_lote = max_lote
+        self.grafos = {}
+        self.pool = None
+        self._pendientes = {}
+        self._latencias = defaultdict(lambda: deque(maxlen=MUESTRAS_LATENCIA))
+        self._solicitudes = defaultdict(int)
+        self._errores = defaultdict(int)
+        self._lotes = defaultdict(int)
+        self._en_lotes = defaultdict(int)
+
+    def _iniciar_pool(self):
+        if self.pool is None:
+            if self.procesos == 0:
+                self.pool = ThreadPoolExecutor(max_workers=1)
+            else:
+                # Con fork los trabajadores heredarían los sockets abiertos y
+                # las conexiones cerradas no llegarían a cerrarse del todo
+                metodos = multiprocessing.get_all_start_methods()
+                contexto = multiprocessing.get_context(
+                    'forkserver' if 'forkserver' in metodos else 'spawn')
+                self.pool = ProcessPoolExecutor(max_workers=self.procesos, mp_context=contexto,
+                                                initializer=_iniciar_trabajador)
+
+    def cerrar(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    # Ruta de un CSV pedido por un cliente: relativa al directorio de datos
+    # y sin salir de él (tampoco con "..", rutas absolutas o enlaces)
+    def ruta_permitida(self, ruta):
+        if not isinstance(ruta, str) or not ruta:
+            raise ErrorSolicitud(400, "La ruta debe ser un texto no vacío")
+        completa = os.path.realpath(os.path.join(self.datos, ruta))
+        if os.path.commonpath([completa, self.datos]) != self.datos:
+            raise ErrorSolicitud(403, f"La ruta debe estar dentro de {self.datos}")
+        return completa
+
+    # Registra un grafo con nombre; se carga (y se arma su cache binaria)
+    # en un trabajador para validar la ruta antes de aceptar consultas
+    async def cargar(self, nombre, ruta):
+        self._iniciar_pool()
+        if not os.path.exists(ruta):
+            raise ErrorSolicitud(400, f"No existe el archivo: {ruta}")
+        try:
+            datos = await asyncio.get_running_loop().run_in_executor(self.pool, _precargar, ruta)
+        except (ValueError, KeyError, OSError) as e:
+            raise ErrorSolicitud(400, f"No se pudo cargar {ruta}: {type(e).__name__}: {e}") from None
+        self.grafos[nombre] = dict(datos, ruta=ruta)
+        return {'nombre': nombre, **self.grafos[nombre]}
+
+    # Encola una solicitud en el lote de (operacion, ruta) y espera su resultado
+    async def consultar(self, operacion, ruta, parametros):
+        self._iniciar_pool()
+        loop = asyncio.get_running_loop()
+        clave = (operacion, ruta)
+        futuro = loop.create_future()
+        if clave not in self._pendientes:
+            temporizador = loop.call_later(self.ventana, self._despachar, clave)
+            self._pendientes[clave] = ([], temporizador)
+        lote, _ = self._pendientes[clave]
+        lote.append((parametros, futuro))
+        if len(lote) >= self.max_lote:
+            self._despachar(clave)
+        return await futuro
+
+    def _despachar(self, clave):
+        lote, temporizador = self._pendientes.pop(clave)
+        temporizador.cancel()
+        asyncio.ensure_future(self._ejecutar(clave, lote))
+
+    async def _ejecutar(self, clave, lote):
+        operacion, ruta = clave
+        self._lotes[operacion] += 1
+        self._en_lotes[operacion] += len(lote)
+        loop = asyncio.get_running_loop()
+        # Un sublote por trabajador, así un lote grande usa todo el pool
+        sublotes = _repartir([p for p, _ in lote], self.procesos)
+        resultados = await asyncio.gather(
+            *(loop.run_in_executor(self.pool, _resolver_lote, operacion, ruta,
+                                   [lote[i][0] for i in posiciones])
+              for posiciones in sublotes),
+            return_exceptions=True)
+        for posiciones, respuestas in zip(sublotes, resultados):
+            if isinstance(respuestas, BaseException):
+                error = f"{type(respuestas).__name__}: {respuestas}"
+                respuestas = [('Exception', error)] * len(posiciones)
+            for i, (error, valor) in zip(posiciones, respuestas):
+                futuro = lote[i][1]
+                # El futuro ya está cancelado si el cliente cerró la conexión
+                if futuro.done():
+                    continue
+                if error is None:
+                    futuro.set_result(valor)
+                else:
+                    futuro.set_exception(ErrorSolicitud(400 if error in _ERRORES_CLIENTE else 500, valor))
+
+    def metricas(self):
+        endpoints = {}
+        for endpoint, latencias in self._latencias.items():
+            ordenadas = sorted(latencias)
+            endpoints[endpoint] = {
+                'solicitudes': self._solicitudes[endpoint],
+                'errores': self._errores[endpoint],
+                'media_ms': 1000 * sum(ordenadas) / len(ordenadas),
+                'p50_ms': 1000 * ordenadas[len(ordenadas) // 2],
+                'p95_ms': 1000 * ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.95))],
+                'max_ms': 1000 * ordenadas[-1],
+            }
+        lotes = {op: {'lotes': n, 'media_por_lote': self._en_lotes[op] / n}
+                 for op, n in self._lotes.items()}
+        return {'endpoints': endpoints, 'lotes': lotes}
+
+    async def _atender(self, metodo, ruta, cuerpo):
+        if metodo == 'GET' and ruta == '/salud':
+            return {'ok': True}
+        if metodo == 'GET' and ruta == '/metricas':
+            return self.metricas()
+        if ruta == '/grafos':
+            if metodo == 'GET':
+                return self.grafos
+            if metodo == 'POST':
+                ruta_csv = self.ruta_permitida(_campo(cuerpo, 'ruta'))
+                return await self.cargar(_campo(cuerpo, 'nombre'), ruta_csv)
+        if metodo == 'POST' and ruta == '/huffman':
+            return await self.consultar('huffman', None, {'texto': str(_campo(cuerpo, 'texto'))})
+        if metodo == 'POST' and ruta in ('/dijkstra', '/prim', '/kruskal'):
+            nombre = _campo(cuerpo, 'grafo')
+            if nombre not in self.grafos:
+                raise ErrorSolicitud(404, f"Grafo no cargado: {nombre}")
+            parametros = {k: v for k, v in cuerpo.items() if k != 'grafo'}
+            if ruta == '/dijkstra':
+                _campo(cuerpo, 'origen')
+            return await self.consultar(ruta[1:], self.grafos[nombre]['ruta'], parametros)
+        raise ErrorSolicitud(404, f"No existe {metodo} {ruta}")
+
+    # Una conexión HTTP/1.1 (con keep-alive): lee solicitudes hasta que el
+    # cliente cierra o pide "Connection: close"
+    async def _conexion(self, lector, escritor):
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea.strip():
+                    break
+                metodo, ruta, _ = linea.decode('latin-1').split(' ', 2)
+                cabeceras = {}
+                while True:
+                    linea = await lector.readline()
+                    if linea in (b'\r\n', b'\n', b''):
+                        break
+                    nombre, _, valor = linea.decode('latin-1').partition(':')
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+                largo = int(cabeceras.get('content-length', 0))
+                crudo = await lector.readexactly(largo) if largo else b''
+
+                inicio = time.perf_counter()
+                endpoint = f"{metodo} {ruta}"
+                if endpoint not in _ENDPOINTS:
+                    endpoint = '404'
+                try:
+                    cuerpo = json.loads(crudo) if crudo else {}
+                    if not isinstance(cuerpo, dict):
+                        raise ErrorSolicitud(400, "El cuerpo debe ser un objeto JSON")
+                    estado, respuesta = 200, await self._atender(metodo, ruta, cuerpo)
+                except ErrorSolicitud as e:
+                    estado, respuesta = e.estado, {'error': str(e)}
+                except json.JSONDecodeError as e:
+                    estado, respuesta = 400, {'error': f"JSON inválido: {e}"}
+                except Exception as e:
+                    estado, respuesta = 500, {'error': f"{type(e).__name__}: {e}"}
+                if ruta != '/metricas':
+                    self._latencias[endpoint].append(time.perf_counter() - inicio)
+                    self._solicitudes[endpoint] += 1
+                    if estado != 200:
+                        self._errores[endpoint] += 1
+
+                datos = json.dumps(respuesta, ensure_ascii=False).encode('utf-8')
+                cerrar = cabeceras.get('connection', '').lower() == 'close'
+                escritor.write(
+                    f"HTTP/1.1 {estado} {_RAZONES.get(estado, 'Error')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(datos)}\r\n"
+                    f"Connection: {'close' if cerrar else 'keep-alive'}\r\n\r\n".encode('latin-1'))
+                escritor.write(datos)
+                await escritor.drain()
+                if cerrar:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+    # Abre el servidor en host:puerto o, si se indica, en el socket Unix
+    async def iniciar(self, host='127.0.0.1', puerto=8765, unix=None):
+        self._iniciar_pool()
+        if unix:
+            return await asyncio.start_unix_server(self._conexion, path=unix)
+        return await asyncio.start_server(self._conexion, host, puerto)
+
+
+_RAZONES = {200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found',
+            500: 'Internal Server Error'}
+
+
+def _campo(cuerpo, nombre):
+    if nombre not in cuerpo:
+        raise ErrorSolicitud(400, f"Falta el campo '{nombre}'")
+    return cuerpo[nombre]
+
+
+# Carga los grafos {nombre: ruta} y atiende hasta Ctrl+C. Las rutas de
+# `grafos` las da quien inicia el servidor y pueden estar en cualquier lado;
+# las de POST /grafos tienen que estar dentro de `datos`.
+def servir(grafos=None, host='127.0.0.1', puerto=8765, unix=None, procesos=None,
+           ventana=VENTANA_LOTE, max_lote=MAX_LOTE, datos=DIRECTORIO_DATOS):
+    servidor = Servidor(procesos, ventana, max_lote, datos)
+
+    async def principal():
+        for nombre, ruta in (grafos or {}).items():
+            datos = await servidor.cargar(nombre, ruta)
+            print(f"Grafo '{nombre}': {datos['nodos']} nodos, {datos['aristas']} aristas")
+        abierto = await servidor.iniciar(host, puerto, unix)
+        print(f"Escuchando en {unix or f'http://{host}:{puerto}'}")
+        async with abierto:
+            await abierto.serve_forever()
+
+    try:
+        asyncio.run(principal())
+    except KeyboardInterrupt:
+        print("\nFinalizado")
+    finally:
+        servidor.cerrar()